@@ -1,109 +1,64 @@
-import librosa
-import numpy as np
+import importlib
 import os
+from typing import Callable, Optional
 from logger_service import LoggerService
+from dance_plan import RenderPlan, extract_json, match_pose, parse_timecode, format_timecode, validate_dance_sequence
+from choreographer import LocalChoreographer
+from metrics import span, request_timer, in_current_context, start_metrics_server
+from warmup import configure_caches, warm_up
+from profiling import profile_request
+from execution import INLINE, MAX_IN_FLIGHT, StageExecutor, PipelineBusy
+from audio_ingest import IngestedAudio, ingest_audio
 from pathlib import Path
-import numpy as np
-import gradio as gr
+from concurrent.futures import ThreadPoolExecutor
+import json
+
+# Heavy dependencies live in subsystem modules that are only imported on first use:
+#   UI -> gradio (create_interface)            analysis -> audio_analysis (librosa)
+#   LLM -> llm_client (openai)                 rendering -> stick_figure_animator, video_generators
+# See import_report.py for the cost of each.
 
 
 UPLOAD_DIR = "uploaded_audio"
 VIDEO_DIR = "generated_videos"
 
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-os.makedirs(VIDEO_DIR, exist_ok=True)
-
-logger = LoggerService()
-
-def extract_audio_features(audio_file: str) -> dict:
-    """
-    Extract audio features from a file using librosa.
-
-    Args:
-        audio_file (str): Path to the audio file.
-
-    Returns:
-        dict: Extracted audio features, including BPM and key.
-    """
-    # Load the audio file
-    y, sr = librosa.load(audio_file, sr=None)
-
-    # Extract tempo (BPM)
-    tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-    # Ensure tempo is a scalar (numpy.ndarray to float)
-    if isinstance(tempo, np.ndarray):  # Check if tempo is an array
-        tempo = tempo[0]  # Extract the first element if it's an array
+CHOREOGRAPHERS = ["GPT-4", "Local (fast)"]
 
-    # Estimate the key using chroma features
-    chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
-    key_index = chroma.mean(axis=1).argmax()
-    keys = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-    key = keys[key_index]
+# Full-song mode: window length in seconds, concurrent LLM calls and render chunks
+WINDOW_SECONDS = 5.0
+MAX_LLM_CONCURRENCY = int(os.getenv("MAX_LLM_CONCURRENCY", "4"))
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "4"))
 
-    # Infer emotional tone (basic heuristic based on BPM)
-    emotion = "Energetic" if tempo > 120 else "Calm" if tempo < 80 else "Moderate"
+# Gradio queue: handlers running at once and requests allowed to wait for one. Handlers
+# beyond the pipeline's admission slots would only be turned away as busy, so by default
+# run no more than MAX_IN_FLIGHT and let the rest wait in Gradio's queue.
+UI_CONCURRENCY = int(os.getenv("BOUNCY_UI_CONCURRENCY", str(MAX_IN_FLIGHT)))
+UI_QUEUE_SIZE = int(os.getenv("BOUNCY_UI_QUEUE_SIZE", "64"))
 
-    # Infer tempo label
-    tempo_label = "Fast" if tempo > 120 else "Slow" if tempo < 80 else "Moderate"
-
-    return {
-        "bpm": round(tempo, 2),
-        "key": key,
-        "tempo": tempo_label,
-        "emotion": emotion
-    }
-
-def format_prompt(genre: str, tempo: str, bpm: float, key: str, emotion: str) -> str:
-    """
-    Format the prompt dynamically based on audio features.
-
-    Args:
-        genre (str): The dance genre (e.g., Hip Hop, Contemporary).
-        tempo (str): The tempo of the music (e.g., Slow, Moderate, Fast).
-        bpm (float): Beats per minute of the audio.
-        key (str): The musical key (e.g., C Major, D Minor).
-        emotion (str): The emotional tone of the music (e.g., Energetic, Dramatic).
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(VIDEO_DIR, exist_ok=True)
 
-    Returns:
-        str: The formatted prompt.
-    """
-    prompt_template = """
-    Generate a JSON object that represents a professional 5-second dance sequence, suitable for use in text-to-video generation.
-
-    Here are the requirements:
-    1. The output must always follow the same JSON format, including a `dance_sequence` array and `metadata`.
-    2. Each entry in the `dance_sequence` must:
-       - Have a `timestamp` (start time of the pose in HH:MM:SS format) and a `duration` (duration of the pose in HH:MM:SS format).
-       - Include a `pose_name` (brief, professional name of the pose).
-       - Contain a `pose_description` (detailed explanation of the pose and movements).
-       - Specify `movement_type` as either "static" or "dynamic".
-       - Include `transition_to_next` (a clear description of how to move into the next pose seamlessly).
-    3. The total duration of the sequence must not exceed 5 seconds.
-    4. The sequence should focus on professional dance movements, with smooth transitions and precise details.
-    5. The JSON must include a `metadata` section that specifies:
-       - `dance_style`: {genre}
-       - `tempo`: {tempo}
-       - `starting_point`: Whether the snippet represents the start, middle, or end of the dance.
-       - `music_features`: The musical context, including:
-         - BPM = {bpm}
-         - Key = {key}
-         - Emotion = {emotion}.
-       - `video_generation_notes`: Any important considerations for generating the video accurately.
-
-    For this request, use the following music details:
-    - Dance Style: {genre}
-    - Tempo: {tempo}
-    - BPM: {bpm}
-    - Key: {key}
-    - Emotion: {emotion}
-
-    Generate smooth, professional, and creative movements that fit the style and tone of the specified music. Ensure logical and seamless transitions between poses.
-    """
-    return prompt_template.format(
-        genre=genre, tempo=tempo, bpm=bpm, key=key, emotion=emotion
-    )
+logger = LoggerService()
+stages = StageExecutor()
+
+# Names that used to be defined here, now re-exported lazily from their subsystem
+_LAZY_EXPORTS = {
+    "extract_audio_features": "audio_analysis",
+    "analyze_signal": "audio_analysis",
+    "format_prompt": "llm_client",
+    "call_openai_api": "llm_client",
+    "OPENAI_TIMEOUT": "llm_client"
+}
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
+
+def create_interface(api_key: str, concurrency: int = UI_CONCURRENCY):
+    import gradio as gr
 
-def create_interface(api_key: str):
     with gr.Blocks() as ui:
         gr.Markdown("# AI Dance Sequence Generator")
 
@@ -114,6 +69,12 @@ def create_interface(api_key: str):
                 value="Hip Hop"
             )
             audio_input = gr.Audio(label="Upload Audio", type="filepath")
+            choreographer_radio = gr.Radio(
+                label="Choreographer",
+                choices=CHOREOGRAPHERS,
+                value=CHOREOGRAPHERS[0]
+            )
+            full_song_checkbox = gr.Checkbox(label="Full song", value=False)
         
         generate_button = gr.Button("Generate Video")
 
@@ -122,107 +83,370 @@ def create_interface(api_key: str):
             json_output = gr.Textbox(label="Generated JSON", lines=20, interactive=False)
             video_output = gr.Video(label="Generated Video", format="mp4", visible=True)
 
-        def handle_generate(genre, audio_path):
-            return process_audio(api_key, genre, audio_path)
+        def handle_generate(genre, audio_path, choreographer, full_song, progress=gr.Progress()):
+            pending = stages.pending()
+            progress(0, desc=f"Waiting for a worker ({pending['in_flight']} requests in progress)")
+            try:
+                if full_song:
+                    return process_full_song(api_key, genre, audio_path, choreographer, progress=progress)
+                return process_audio(api_key, genre, audio_path, choreographer, progress=progress)
+            except PipelineBusy as e:
+                return f"Server busy: {e}", None, None
 
         generate_button.click(
             handle_generate,
-            inputs=[genre_dropdown, audio_input],
+            inputs=[genre_dropdown, audio_input, choreographer_radio, full_song_checkbox],
             outputs=[status_message, json_output, video_output]
         )
 
+    # Gradio shows each user their position while they wait in this queue
+    ui.queue(max_size=UI_QUEUE_SIZE, default_concurrency_limit=concurrency)
     return ui
 
-def process_audio(api_key: str, genre: str, audio_path: str):
+@stages.admit()
+@profile_request("process_audio")
+@request_timer("process_audio")
+def process_audio(api_key: str, genre: str, audio_path: str, choreographer: str = "GPT-4",
+                  progress: Optional[Callable[[float, str], None]] = None):
     """
-    Process the uploaded audio, extract features, and generate a JSON sequence via OpenAI API.
+    Process the uploaded audio, extract features, and generate a JSON sequence.
+
+    The sequence comes from the OpenAI API, or from the local choreographer when
+    "Local (fast)" is selected or the API call fails.
 
     Args:
         api_key (str): OpenAI API key.
         genre (str): Selected genre.
         audio_path (str): Path to the uploaded audio file.
+        choreographer (str): One of CHOREOGRAPHERS.
+        progress (callable, optional): Called with (fraction, description) at each stage.
 
     Returns:
         tuple: Status message, JSON output, and video path.
+
+    Raises:
+        PipelineBusy: If the pipeline is already running its maximum number of requests.
     """
+    from audio_analysis import analyze_ingested
+    from stick_figure_animator import StickFigureAnimator
+
+    report = progress or (lambda fraction, desc: None)
     try:
-        # Call OpenAI API to generate JSON sequence
-        json_response = call_openai_api(api_key, genre, audio_path)
+        # Decode once into the PCM cache; analysis memory-maps the result
+        report(0.05, "Decoding audio")
+        audio = stages.run_cpu(ingest_audio, audio_path, UPLOAD_DIR)  # Records its own "ingest" span
+        report(0.15, "Analysing audio")
+        with span("analysis"):
+            features = stages.run_cpu(analyze_ingested, audio)
     except Exception as e:
-        return f"Error while calling OpenAI API: {e}", None, None
+        return f"Error while analysing audio: {e}", None, None
+
+    note = ""
+    json_response = None
+    report(0.3, "Choreographing")
+    if choreographer != "Local (fast)":
+        from llm_client import call_openai_api
+        try:
+            # Call OpenAI API to generate JSON sequence; a malformed reply falls back too
+            response = stages.run_io(call_openai_api, api_key, genre, audio_path, features)
+            validate_dance_sequence(extract_json(response))
+            json_response = response
+        except Exception as e:
+            logger.warning(f"OpenAI choreography failed, using the local choreographer: {e}")
+            note = f" (OpenAI choreography unavailable: {e}; used the local choreographer)"
+    if json_response is None:
+        json_response = generate_local_sequence(genre, features)
 
     # Save JSON to a file for reference
     json_path = os.path.join(VIDEO_DIR, f"{Path(audio_path).stem}_{genre}.json")
     with open(json_path, "w") as json_file:
         json_file.write(json_response)
 
-    # Simulate video generation based on the JSON
-    video_path = generate_video({}, audio_path, genre)
+    # Compile the dance sequence into a render plan and render it
+    report(0.6, "Compiling dance plan")
+    try:
+        with span("compile_plan"):
+            plan = StickFigureAnimator().compile_plan(json_response, genre)
+    except ValueError as e:
+        return f"Error while compiling dance sequence: {e}", json_response, None
+    report(0.7, "Rendering video")
+    video_path = generate_video(plan, audio_path, genre)
 
     # Return status, JSON response, and video path
     return (
-        f"Video generated successfully! JSON saved at: {json_path}, Video saved at: {video_path}",
+        f"Video generated successfully{note}! JSON saved at: {json_path}, Video saved at: {video_path}",
         json_response,
         video_path
     )
 
-from openai import OpenAI
+def split_windows(duration: float, window_seconds: float = WINDOW_SECONDS) -> list:
+    """
+    Split a track into consecutive (start, end) windows in seconds.
+
+    Args:
+        duration (float): Track length in seconds.
+        window_seconds (float): Length of each window.
 
-def call_openai_api(api_key: str, genre: str, audio_file: str) -> str:
+    Returns:
+        list: Windows covering the track; a tail shorter than one second is dropped.
+    """
+    windows = []
+    start = 0.0
+    while duration - start >= 1.0 or not windows:
+        end = min(start + window_seconds, duration)
+        windows.append((start, end))
+        start = end
+        if start >= duration:
+            break
+    return windows
+
+def choreograph_window(api_key: str, genre: str, audio_path: str, audio: IngestedAudio,
+                       window: tuple, starting_point: str, choreographer: str,
+                       start_pose: Optional[str] = None, end_pose: Optional[str] = None) -> tuple:
     """
-    Call OpenAI API to generate a JSON dance sequence based on audio features and genre.
+    Analyse one window of the track and, unless choreographing locally, ask the LLM for it.
 
     Args:
         api_key (str): OpenAI API key.
-        genre (str): Selected dance genre.
-        audio_file (str): Path to the uploaded audio file.
+        genre (str): Selected genre.
+        audio_path (str): Path to the uploaded audio file.
+        audio (IngestedAudio): Decoded PCM of the whole track.
+        window (tuple): (start, end) of the window in seconds.
+        starting_point (str): Where the window sits in the song (start, middle or end).
+        choreographer (str): One of CHOREOGRAPHERS.
+        start_pose (str, optional): Pose the window should begin with.
+        end_pose (str, optional): Pose the window should end with.
 
     Returns:
-        str: JSON response from the API.
-    """
-    # Extract audio features using the provided function
-    features = extract_audio_features(audio_file)
-    print(features)
-    # Format the prompt dynamically
-    prompt = format_prompt(
-        genre=genre,
-        tempo=features["tempo"],
-        bpm=features["bpm"],
-        key=features["key"],
-        emotion=features["emotion"]
-    )
+        tuple: Audio features and the parsed dance sequence dict, or None when the window
+        is left to the local choreographer.
+    """
+    from audio_analysis import analyze_ingested
+
+    start, end = window
+    with span("analysis"):
+        # Only the handle crosses to the worker, which maps just this window's pages
+        features = stages.run_cpu(analyze_ingested, audio, start, end)
+    if choreographer == "Local (fast)":
+        return features, None
+    from llm_client import call_openai_api
+    try:
+        data = extract_json(call_openai_api(api_key, genre, audio_path, features, starting_point,
+                                            start_pose, end_pose))
+        validate_dance_sequence(data)
+        return features, data
+    except Exception as e:
+        logger.warning(f"Window {start:.1f}-{end:.1f}s fell back to the local choreographer: {e}")
+        return features, None
 
-    #Call the OpenAI API
-    client = OpenAI(api_key=api_key)
-    chat_response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are a JSON generator for professional dance sequences."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+def chain_windows(genre: str, windows: list, results: list, local: LocalChoreographer) -> tuple:
+    """
+    Fill in the windows without an LLM sequence, each continuing from the window before it.
+
+    Local windows start from the previous window's last pose and keep its beat phase,
+    so the figure carries on across boundaries instead of restarting every window.
+
+    Args:
+        genre (str): Selected genre.
+        windows (list): (start, end) of each window in seconds.
+        results (list): (features, sequence or None) for each window, from choreograph_window.
+        local (LocalChoreographer): Choreographer for the missing windows.
+
+    Returns:
+        tuple: Dance sequence dict for each window and how many were choreographed locally.
+    """
+    sequences = []
+    fallbacks = 0
+    pose, first_beat = None, 0.0
+    for (start, end), (features, data) in zip(windows, results):
+        if data is None:
+            fallbacks += 1
+            with span("local_choreographer"):
+                data = local.generate(
+                    genre, float(features["bpm"]), duration=end - start,
+                    tempo=features["tempo"], key=features["key"], emotion=features["emotion"],
+                    start_pose=pose, first_beat=first_beat
+                )
+            pose, first_beat = data["metadata"]["end_pose"], data["metadata"]["next_beat"]
+        else:
+            last = data["dance_sequence"][-1]
+            pose = match_pose(last["pose_name"], last.get("pose_description", ""), genre,
+                              local.positions, len(data["dance_sequence"]) - 1)
+            first_beat = 0.0
+        sequences.append(data)
+    return sequences, fallbacks
+
+def stitch_windows(genre: str, windows: list, sequences: list) -> dict:
+    """
+    Join per-window dance sequences into one sequence on the song's timeline.
+
+    Entries are shifted by their window's start and clipped to the window, so a
+    window's first pose eases in from the previous window's last pose when compiled.
+
+    Args:
+        genre (str): Selected genre.
+        windows (list): (start, end) of each window in seconds.
+        sequences (list): Dance sequence dict for each window.
+
+    Returns:
+        dict: Combined dance sequence with per-window metadata.
+    """
+    dance_sequence = []
+    for (start, end), data in zip(windows, sequences):
+        for entry in data["dance_sequence"]:
+            offset = parse_timecode(entry["timestamp"])
+            if offset >= end - start:
+                continue
+            duration = min(parse_timecode(entry["duration"]), end - start - offset)
+            dance_sequence.append({
+                **entry,
+                "timestamp": format_timecode(start + offset),
+                "duration": format_timecode(duration)
+            })
+    return {
+        "dance_sequence": dance_sequence,
+        "metadata": {
+            "dance_style": genre,
+            "starting_point": "full song",
+            "windows": [
+                {"start": format_timecode(start), "end": format_timecode(end),
+                 "metadata": data.get("metadata", {})}
+                for (start, end), data in zip(windows, sequences)
+            ]
+        }
+    }
+
+@stages.admit()
+@profile_request("process_full_song")
+@request_timer("process_full_song")
+def process_full_song(api_key: str, genre: str, audio_path: str, choreographer: str = "GPT-4",
+                      window_seconds: float = WINDOW_SECONDS,
+                      max_concurrency: int = MAX_LLM_CONCURRENCY,
+                      progress: Optional[Callable[[float, str], None]] = None):
+    """
+    Choreograph the whole track window by window and render one continuous video.
+
+    Windows are analysed and sent to the LLM concurrently (at most `max_concurrency`
+    calls in flight), so wall time tracks the slowest window rather than the sum of
+    all of them. Windows without an LLM sequence are then choreographed locally in
+    order, each continuing the previous window's pose and beat phase, before the
+    result is stitched into a single sequence and rendered in parallel.
+
+    Args:
+        api_key (str): OpenAI API key.
+        genre (str): Selected genre.
+        audio_path (str): Path to the uploaded audio file.
+        choreographer (str): One of CHOREOGRAPHERS.
+        window_seconds (float): Length of each window.
+        max_concurrency (int): Maximum number of windows choreographed at once.
+        progress (callable, optional): Called with (fraction, description) at each stage.
+
+    Returns:
+        tuple: Status message, JSON output, and video path.
+
+    Raises:
+        PipelineBusy: If the pipeline is already running its maximum number of requests.
+    """
+    from stick_figure_animator import StickFigureAnimator
+    from video_generators import render_plan_video
+
+    report = progress or (lambda fraction, desc: None)
+    try:
+        # Decode once; every window memory-maps the same PCM file
+        report(0.05, "Decoding audio")
+        audio = stages.run_cpu(ingest_audio, audio_path, UPLOAD_DIR)  # Records its own "ingest" span
+    except Exception as e:
+        return f"Error while analysing audio: {e}", None, None
 
-    # Extract and return the generated JSON
-    return chat_response.choices[0].message.content
-    # return "This is working"
+    windows = split_windows(audio.duration, window_seconds)
+    starting_points = ["start" if i == 0 else "end" if i == len(windows) - 1 else "middle"
+                       for i in range(len(windows))]
+    logger.info(f"Choreographing {len(windows)} windows of {audio_path}")
+    report(0.2, f"Choreographing {len(windows)} windows")
 
-def generate_video(features: dict, audio_file: str, genre: str) -> str:
+    local = LocalChoreographer()
+    boundaries = [None] * (len(windows) + 1)
+    if choreographer != "Local (fast)":
+        # LLM windows are requested concurrently, so agree on each boundary's pose up front
+        boundaries[1:-1] = local.pose_walk(genre, len(windows) - 1)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+            results = list(pool.map(
+                in_current_context(
+                    lambda i: choreograph_window(api_key, genre, audio_path, audio, windows[i],
+                                                 starting_points[i], choreographer,
+                                                 boundaries[i], boundaries[i + 1])
+                ),
+                range(len(windows))
+            ))
+        sequences, fallbacks = chain_windows(genre, windows, results, local)
+    except Exception as e:
+        return f"Error while choreographing audio: {e}", None, None
+    json_response = json.dumps(stitch_windows(genre, windows, sequences), indent=2)
+
+    json_path = os.path.join(VIDEO_DIR, f"{Path(audio_path).stem}_{genre}_full.json")
+    with open(json_path, "w") as json_file:
+        json_file.write(json_response)
+
+    report(0.6, "Compiling dance plan")
+    try:
+        with span("compile_plan"):
+            plan = StickFigureAnimator().compile_plan(json_response, genre)
+    except ValueError as e:
+        return f"Error while compiling dance sequence: {e}", json_response, None
+    report(0.7, "Rendering video")
+    video_path = os.path.join(VIDEO_DIR, f"{Path(audio_path).stem}_{genre}_full.mp4")
+    with span("render_video"):
+        # Runs here and fans the frame chunks out to the CPU pool; encoding stays in this thread
+        video_path = render_plan_video(plan, video_path, RENDER_WORKERS)
+
+    note = ""
+    if fallbacks and choreographer != "Local (fast)":
+        note = f" ({fallbacks} of {len(windows)} windows used the local choreographer)"
+    return (
+        f"Full song video generated successfully{note}! JSON saved at: {json_path}, Video saved at: {video_path}",
+        json_response,
+        video_path
+    )
+
+def generate_local_sequence(genre: str, features: dict) -> str:
     """
-    Generate a video based on audio features.
+    Generate a JSON dance sequence offline with the pose-transition graph.
 
     Args:
+        genre (str): Selected dance genre.
         features (dict): Extracted audio features.
+
+    Returns:
+        str: JSON dance sequence in the same format as the OpenAI response.
+    """
+    with span("local_choreographer"):
+        return LocalChoreographer().generate_json(
+            genre,
+            float(features["bpm"]),
+            tempo=features["tempo"],
+            key=features["key"],
+            emotion=features["emotion"]
+        )
+
+def generate_video(plan: RenderPlan, audio_file: str, genre: str) -> str:
+    """
+    Generate a video from a compiled dance plan.
+
+    Args:
+        plan (RenderPlan): Compiled dance sequence with precomputed joint positions.
         audio_file (str): Path to the uploaded audio file.
         genre (str): Selected genre.
 
     Returns:
         str: Path to the generated video file.
     """
-    # Simulate video generation
+    from video_generators import render_plan_video
+
     video_path = os.path.join(VIDEO_DIR, f"{Path(audio_file).stem}_{genre}.mp4")
-    with open(video_path, "w") as f:
-        f.write("Generated video content")
-    return video_path #Generate video from the dance sequence and audio using the video generator
+    with span("render_video"):
+        return stages.run_cpu(render_plan_video, plan, video_path)
 
 def generateVideoFromText(text: str) -> str:
     """Generate a video from the text"""
@@ -235,6 +459,35 @@ if __name__ == "__main__":
         logger.warning("REPLICATE_API_TOKEN not found in environment variables")
         print("Warning: REPLICATE_API_TOKEN not set. Please set it before generating videos.")
 
+    # Persistent numba/librosa caches must be configured before librosa is imported
+    configure_caches()
+    if INLINE:
+        # Stages run in this process, so warm it up here
+        if os.getenv("BOUNCY_WARMUP") == "1":
+            warm_up()
+    else:
+        # Spawn the CPU workers now; each one warms itself up with BOUNCY_WARMUP=1
+        stages.start()
+
+    metrics_port = os.getenv("BOUNCY_METRICS_PORT")
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if not api_key:
+        logger.warning("OPENAI_API_KEY not found in environment variables; GPT-4 requests will use the local choreographer")
+
     logger.info("Starting BouncyBot application")
-    app = create_interface(api_key)
-    app.launch()
\ No newline at end of file
+    api_port = os.getenv("BOUNCY_API_PORT")
+    if api_port:
+        # Serve the headless job API with the UI mounted at / on the same server
+        import gradio as gr
+        import uvicorn
+        from job_api import JOB_CONCURRENCY, create_api
+
+        # Jobs and UI handlers share the pipeline's admission slots
+        app = create_interface(api_key, min(UI_CONCURRENCY, max(1, MAX_IN_FLIGHT - JOB_CONCURRENCY)))
+        uvicorn.run(gr.mount_gradio_app(create_api(), app, path="/"), host="0.0.0.0", port=int(api_port))
+    else:
+        app = create_interface(api_key)
+        app.launch()
\ No newline at end of file
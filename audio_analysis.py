@@ -0,0 +1,82 @@
+import librosa
+import numpy as np
+from metrics import span
+
+def extract_audio_features(audio_file: str) -> dict:
+    """
+    Extract audio features from a file using librosa.
+
+    Args:
+        audio_file (str): Path to the audio file.
+
+    Returns:
+        dict: Extracted audio features, including BPM and key.
+    """
+    # Load the audio file
+    y, sr = load_audio(audio_file)
+    return analyze_signal(y, sr)
+
+def analyze_ingested(audio, start: float = 0.0, end: float = None) -> dict:
+    """
+    Extract audio features from a window of an ingested upload without decoding it again.
+
+    Args:
+        audio (IngestedAudio): Decoded PCM cache entry from audio_ingest.ingest_audio.
+        start (float): Window start in seconds.
+        end (float, optional): Window end in seconds; defaults to the end of the track.
+
+    Returns:
+        dict: Extracted audio features, including BPM and key.
+    """
+    return analyze_signal(audio.samples(start, end), audio.sr)
+
+def load_audio(audio_file: str) -> tuple:
+    """
+    Decode an audio file to mono samples at its native sample rate.
+
+    Args:
+        audio_file (str): Path to the audio file.
+
+    Returns:
+        tuple: Samples as np.ndarray and the sample rate.
+    """
+    with span("load_audio"):
+        return librosa.load(audio_file, sr=None)
+
+def analyze_signal(y: np.ndarray, sr: int) -> dict:
+    """
+    Extract audio features from an already decoded signal.
+
+    Args:
+        y (np.ndarray): Mono audio samples.
+        sr (int): Sample rate of `y`.
+
+    Returns:
+        dict: Extracted audio features, including BPM and key.
+    """
+    # Extract tempo (BPM)
+    with span("beat_track"):
+        tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+    # Ensure tempo is a scalar (numpy.ndarray to float)
+    if isinstance(tempo, np.ndarray):  # Check if tempo is an array
+        tempo = tempo[0]  # Extract the first element if it's an array
+
+    # Estimate the key using chroma features
+    with span("chroma_cqt"):
+        chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
+    key_index = chroma.mean(axis=1).argmax()
+    keys = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+    key = keys[key_index]
+
+    # Infer emotional tone (basic heuristic based on BPM)
+    emotion = "Energetic" if tempo > 120 else "Calm" if tempo < 80 else "Moderate"
+
+    # Infer tempo label
+    tempo_label = "Fast" if tempo > 120 else "Slow" if tempo < 80 else "Moderate"
+
+    return {
+        "bpm": round(tempo, 2),
+        "key": key,
+        "tempo": tempo_label,
+        "emotion": emotion
+    }
@@ -0,0 +1,73 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from logger_service import LoggerService
+from metrics import span
+
+logger = LoggerService()
+
+HASH_CHUNK_BYTES = 1 << 20
+
+@dataclass(frozen=True)
+class IngestedAudio:
+    """
+    An upload decoded once to mono float32 PCM, stored as `<sha256>_<sr>hz.npy`.
+
+    Small and picklable, so it is what gets passed between stages and worker
+    processes; the samples themselves are memory-mapped by each consumer.
+    """
+    path: str
+    sr: int
+    digest: str
+    frames: int
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sr
+
+    def samples(self, start: float = 0.0, end: Optional[float] = None) -> np.ndarray:
+        """Read-only memory-mapped samples between `start` and `end` seconds"""
+        y = np.load(self.path, mmap_mode="r")
+        return y[int(start * self.sr):None if end is None else int(end * self.sr)]
+
+def file_digest(audio_file: str) -> str:
+    """SHA-256 of the file contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(audio_file, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def ingest_audio(audio_file: str, upload_dir: str) -> IngestedAudio:
+    """
+    Decode an upload to mono PCM under `upload_dir`, unless the same content was already ingested.
+
+    Args:
+        audio_file (str): Path to the uploaded (possibly compressed) audio file.
+        upload_dir (str): Directory holding the PCM cache.
+
+    Returns:
+        IngestedAudio: Handle to the cached PCM file.
+    """
+    with span("ingest"):
+        digest = file_digest(audio_file)
+        cached = next(Path(upload_dir).glob(f"{digest}_*hz.npy"), None)
+        if cached is not None:
+            logger.info(f"Reusing decoded audio {cached} for {audio_file}")
+            sr = int(cached.stem.rsplit("_", 1)[1][:-len("hz")])
+            return IngestedAudio(str(cached), sr, digest, len(np.load(cached, mmap_mode="r")))
+
+        from audio_analysis import load_audio
+
+        y, sr = load_audio(audio_file)
+        path = Path(upload_dir) / f"{digest}_{sr}hz.npy"
+        # Write then rename so concurrent workers never map a half-written file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(y, dtype=np.float32))
+        os.replace(tmp_path, path)
+        logger.info(f"Decoded {audio_file} to {path} ({len(y) / sr:.1f}s at {sr} Hz)")
+        return IngestedAudio(str(path), int(sr), digest, len(y))
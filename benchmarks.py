@@ -0,0 +1,226 @@
+"""
+Reproducible benchmarks for the analysis, animation and encoding hot paths.
+
+All inputs are synthetic (click tracks at known BPMs, tones in known keys, the
+built-in DanceMovements sequences), so runs on different machines or commits can
+be compared offline. Run with:
+
+    python benchmarks.py [--repeats N] [--output results.json]
+                         [--baseline baseline.json] [--threshold 1.25]
+
+With --baseline, any benchmark whose p50 latency or peak memory exceeds the
+baseline by more than --threshold is reported and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 22050
+CLICK_BPMS = (60, 90, 120, 150)
+# Pure tones on the tonic of each key; chroma_cqt should report the key name
+KEY_TONES = {"C": 261.63, "E": 329.63, "A": 440.0}
+DANCE_STYLES = ("Tap Dance", "Broadway", "Hip Hop", "Contemporary")
+
+def write_wav(path: Path, y: np.ndarray, sr: int = SAMPLE_RATE):
+    """Write mono float samples in [-1, 1] as a 16-bit PCM WAV"""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sr)
+        wav.writeframes((np.clip(y, -1, 1) * 32767).astype(np.int16).tobytes())
+
+def click_track(bpm: float, seconds: float = 10.0, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Short decaying clicks on every beat"""
+    y = np.zeros(int(seconds * sr), dtype=np.float32)
+    click = np.exp(-np.linspace(0, 8, int(0.02 * sr))) * np.sin(2 * np.pi * 1000 * np.arange(int(0.02 * sr)) / sr)
+    for beat in np.arange(0, seconds, 60.0 / bpm):
+        start = int(beat * sr)
+        end = min(start + len(click), len(y))
+        y[start:end] += click[:end - start]
+    return 0.8 * y
+
+def tone(frequency: float, seconds: float = 10.0, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Sine tone with its first two harmonics"""
+    t = np.arange(int(seconds * sr)) / sr
+    return 0.3 * (np.sin(2 * np.pi * frequency * t) + 0.3 * np.sin(4 * np.pi * frequency * t)
+                  + 0.1 * np.sin(6 * np.pi * frequency * t)).astype(np.float32)
+
+def measure(func: Callable[[], object], repeats: int, items: Optional[Callable[[object], int]] = None) -> Dict:
+    """
+    Time `func` over `repeats` runs after one untimed warm-up, then trace one more run's memory.
+
+    Args:
+        func: Zero-argument callable under test.
+        repeats: Number of timed runs.
+        items: Optional function mapping the result to a work count (e.g. frames) for throughput.
+
+    Returns:
+        dict: Latency percentiles in seconds, peak traced memory in MB and optional throughput.
+    """
+    result = func()
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))]
+
+    stats = {
+        "repeats": repeats,
+        "mean": statistics.fmean(latencies),
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p99": percentile(99),
+        "peak_memory_mb": peak / (1024 * 1024)
+    }
+    if items is not None:
+        count = items(result)
+        stats["items"] = count
+        stats["throughput_per_s"] = count / stats["p50"] if stats["p50"] else None
+    return stats
+
+def bench_analysis(workdir: Path, repeats: int) -> Dict:
+    from audio_analysis import extract_audio_features
+
+    results = {}
+    for bpm in CLICK_BPMS:
+        path = workdir / f"click_{bpm}.wav"
+        write_wav(path, click_track(bpm))
+        stats = measure(lambda: extract_audio_features(str(path)), repeats)
+        stats["expected_bpm"] = bpm
+        stats["detected_bpm"] = float(extract_audio_features(str(path))["bpm"])
+        results[f"extract_audio_features/click_{bpm}bpm"] = stats
+    for key, frequency in KEY_TONES.items():
+        path = workdir / f"tone_{key}.wav"
+        write_wav(path, tone(frequency))
+        stats = measure(lambda: extract_audio_features(str(path)), repeats)
+        stats["expected_key"] = key
+        stats["detected_key"] = extract_audio_features(str(path))["key"]
+        results[f"extract_audio_features/tone_{key}"] = stats
+    return results
+
+def bench_animation(repeats: int) -> Dict:
+    from dance_movements import DanceMovements
+    from stick_figure_animator import StickFigureAnimator
+
+    animator = StickFigureAnimator()
+    return {
+        f"create_animation/{style}": measure(
+            lambda: animator.create_animation(DanceMovements.SEQUENCES[style], style), repeats, items=len
+        )
+        for style in DANCE_STYLES
+    }
+
+def bench_encoding(repeats: int) -> Dict:
+    from choreographer import LocalChoreographer
+    from dance_movements import DanceMovements
+    from stick_figure_animator import StickFigureAnimator
+    from video_generators import PygameGenerator
+
+    generator = PygameGenerator()
+    results = {}
+    for style in DANCE_STYLES:
+        movements = DanceMovements.SEQUENCES[style]
+        results[f"PygameGenerator.generate/{style}"] = measure(
+            lambda: generator.generate(movements), repeats, items=lambda _: len(movements)
+        )
+        sequence = LocalChoreographer(seed=0).generate(style, 120.0, duration=10.0)
+        plan = StickFigureAnimator(640, 480).compile_plan(sequence, style)
+        results[f"PygameGenerator.generate_from_plan/{style}"] = measure(
+            lambda: generator.generate_from_plan(plan), repeats, items=lambda _: len(plan)
+        )
+    return results
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> list:
+    """Return a message for every benchmark slower or larger than `threshold` x its baseline"""
+    regressions = []
+    for name, stats in results["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            continue
+        for metric in ("p50", "peak_memory_mb"):
+            if base[metric] and stats[metric] > base[metric] * threshold:
+                regressions.append(
+                    f"{name}: {metric} {stats[metric]:.4f} vs baseline {base[metric]:.4f} "
+                    f"(x{stats[metric] / base[metric]:.2f})"
+                )
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write results")
+    parser.add_argument("--baseline", help="previous results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown ratio")
+    parser.add_argument("--only", choices=("analysis", "animation", "encoding"), action="append",
+                        help="run a subset of the suites (repeatable)")
+    args = parser.parse_args()
+    suites = args.only or ["analysis", "animation", "encoding"]
+    output = Path(args.output).resolve()
+    baseline_path = Path(args.baseline).resolve() if args.baseline else None
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    # Run stages in this process so timings measure the work, not worker spawn and pickling
+    os.environ.setdefault("BOUNCY_INLINE_STAGES", "1")
+    sys.path.insert(0, str(Path(__file__).parent))
+    benchmarks = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # Generators write videos relative to the working directory
+        os.chdir(workdir)
+        try:
+            if "analysis" in suites:
+                benchmarks.update(bench_analysis(Path(workdir), args.repeats))
+            if "animation" in suites:
+                benchmarks.update(bench_animation(args.repeats))
+            if "encoding" in suites:
+                benchmarks.update(bench_encoding(args.repeats))
+        finally:
+            os.chdir(cwd)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeats": args.repeats
+        },
+        "benchmarks": benchmarks
+    }
+    output.write_text(json.dumps(results, indent=2))
+
+    for name, stats in benchmarks.items():
+        throughput = f"  {stats['throughput_per_s']:8.1f}/s" if stats.get("throughput_per_s") else ""
+        print(f"{name:<52} p50 {stats['p50'] * 1000:9.2f} ms  p99 {stats['p99'] * 1000:9.2f} ms"
+              f"  peak {stats['peak_memory_mb']:7.1f} MB{throughput}")
+    print(f"Results written to {output}")
+
+    if baseline_path:
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
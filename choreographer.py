@@ -0,0 +1,191 @@
+import json
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+from dance_movements import DanceMovements, Position
+from dance_plan import format_timecode
+
+# Edge weight multipliers applied on top of the joint distance between two poses
+CROSS_GENRE_PENALTY = 3.0     # Borrowing a pose from another genre
+SEQUENCE_BONUS = 0.5          # Transition that appears in the genre's hand-written sequence
+
+# Beats each pose is held for, before stretching to respect MIN_POSE_SECONDS
+BEATS_PER_POSE = {
+    "Tap Dance": 1,
+    "Broadway": 2,
+    "Hip Hop": 1,
+    "Contemporary": 2
+}
+MIN_POSE_SECONDS = 0.3
+
+# Poses further apart than this (mean joint distance in pixels) are danced as dynamic moves
+DYNAMIC_DISTANCE = 3.0
+
+def joint_distance(a: Position, b: Position) -> float:
+    """Mean Euclidean distance between matching joints of two poses"""
+    joints_a = [a.head, a.body, *a.arms, *a.legs]
+    joints_b = [b.head, b.body, *b.arms, *b.legs]
+    return sum(math.dist(p, q) for p, q in zip(joints_a, joints_b)) / len(joints_a)
+
+class LocalChoreographer:
+    """
+    Offline choreographer that walks a pose-transition graph instead of calling an LLM.
+
+    Every pose in DanceMovements is a node; edges are weighted by joint distance,
+    cheaper within the genre and along its hand-written sequence. Generated sequences
+    use the same JSON format as the GPT-4 prompt so they compile into render plans
+    the same way.
+    """
+
+    def __init__(self, neighbours: int = 6, seed: Optional[int] = None):
+        # Distances are translation invariant, so any center will do
+        self.positions = DanceMovements.calculate_positions((0, 0))
+        self.neighbours = neighbours
+        self.rng = random.Random(seed)
+        self._graphs: Dict[str, Dict[str, List[Tuple[str, float]]]] = {}
+
+    def transition_graph(self, genre: str) -> Dict[str, List[Tuple[str, float]]]:
+        """Return the genre's adjacency list of (pose, weight), cheapest first"""
+        if genre not in self._graphs:
+            self._graphs[genre] = self._build_graph(genre)
+        return self._graphs[genre]
+
+    def _build_graph(self, genre: str) -> Dict[str, List[Tuple[str, float]]]:
+        genre_poses = set(DanceMovements.genre_poses(genre))
+        sequence_edges = set()
+        for step in DanceMovements.SEQUENCES[genre]:
+            frames = step["frames"]
+            for a, b in zip(frames, frames[1:]):
+                sequence_edges.update({(a, b), (b, a)})
+
+        graph = {}
+        for name, pose in self.positions.items():
+            edges = []
+            for other, other_pose in self.positions.items():
+                if other == name:
+                    continue
+                weight = joint_distance(pose, other_pose)
+                if other not in genre_poses:
+                    weight *= CROSS_GENRE_PENALTY
+                if (name, other) in sequence_edges:
+                    weight *= SEQUENCE_BONUS
+                edges.append((other, weight))
+            edges.sort(key=lambda edge: edge[1])
+            graph[name] = edges[:self.neighbours]
+        return graph
+
+    def _next_pose(self, genre: str, current: str, previous: Optional[str]) -> str:
+        edges = [e for e in self.transition_graph(genre)[current] if e[0] != previous]
+        edges = edges or self.transition_graph(genre)[current]
+        poses = [pose for pose, _ in edges]
+        weights = [1.0 / (1.0 + weight) for _, weight in edges]
+        return self.rng.choices(poses, weights=weights)[0]
+
+    def pose_walk(self, genre: str, count: int, start: Optional[str] = None) -> List[str]:
+        """Return `count` poses visited by a walk over the genre's transition graph"""
+        poses = []
+        previous, current = None, start or DanceMovements.genre_poses(genre)[0]
+        for _ in range(count):
+            previous, current = current, self._next_pose(genre, current, previous)
+            poses.append(current)
+        return poses
+
+    def generate(self, genre: str, bpm: float, duration: float = 5.0, tempo: str = "Moderate",
+                 key: str = "C", emotion: str = "Moderate", start_pose: Optional[str] = None,
+                 first_beat: float = 0.0) -> dict:
+        """
+        Generate a beat-aligned dance sequence.
+
+        Args:
+            genre (str): The dance genre (e.g., Hip Hop, Contemporary).
+            bpm (float): Beats per minute of the audio.
+            duration (float): Length of the sequence in seconds.
+            tempo (str): Tempo label, copied into the metadata.
+            key (str): Musical key, copied into the metadata.
+            emotion (str): Emotional tone, copied into the metadata.
+            start_pose (str, optional): Pose the figure is already in, e.g. where the
+                previous window ended; the sequence moves on from it rather than
+                restarting at the genre's first pose.
+            first_beat (float): Seconds until the first step boundary of the beat grid;
+                until then the figure holds `start_pose`.
+
+        Returns:
+            dict: Dance sequence in the same format as the GPT-4 prompt asks for. The
+            metadata's `end_pose` and `next_beat` (seconds after the end until the next
+            step is due) chain into the next window's `start_pose` and `first_beat`.
+        """
+        beat = 60.0 / bpm if bpm > 0 else 0.5
+        beats = BEATS_PER_POSE[genre]
+        while beats * beat < MIN_POSE_SECONDS:
+            beats *= 2
+        step_seconds = beats * beat
+
+        sequence = []
+
+        def add_step(start: float, length: float, pose: str, previous: Optional[str], description: str,
+                     transition: str):
+            # movement_type describes how the figure arrives in this pose
+            distance = joint_distance(self.positions[previous], self.positions[pose]) if previous else 0.0
+            sequence.append({
+                "timestamp": format_timecode(start),
+                "duration": format_timecode(length),
+                "pose_name": pose,
+                "pose_description": description,
+                "movement_type": "dynamic" if distance > DYNAMIC_DISTANCE else "static",
+                "transition_to_next": transition
+            })
+
+        start = 0.0
+        grid_start = 0.0      # Where the beat grid's step boundaries start
+        first_length = None
+        if start_pose is None:
+            previous, current = None, DanceMovements.genre_poses(genre)[0]
+        else:
+            previous, current = start_pose, self._next_pose(genre, start_pose, None)
+            grid_start = max(0.0, first_beat)
+            if grid_start >= MIN_POSE_SECONDS:
+                # Hold the incoming pose until the grid's next step boundary
+                length = min(grid_start, duration)
+                if duration - length < MIN_POSE_SECONDS:
+                    length = duration
+                add_step(0.0, length, start_pose, None,
+                         f"{start_pose.replace('_', ' ').capitalize()} held from the previous section",
+                         f"Move into {current.replace('_', ' ')} on the next beat")
+                start = length
+            elif grid_start > 1e-6:
+                # Too little left to hold: move on now and stretch the first step to the grid
+                first_length = grid_start + step_seconds
+
+        while start < duration - 1e-6:
+            length = min(first_length or step_seconds, duration - start)
+            first_length = None
+            if duration - (start + length) < MIN_POSE_SECONDS:
+                # Fold a leftover too short to dance into this step
+                length = duration - start
+            upcoming = self._next_pose(genre, current, previous)
+            add_step(start, length, current, previous,
+                     f"{current.replace('_', ' ').capitalize()} held for {beats} beat(s)",
+                     f"Move into {upcoming.replace('_', ' ')} on the next beat")
+            previous, current = current, upcoming
+            start += length
+
+        # The grid keeps running past the end; the next window picks it up from here
+        steps_due = math.ceil(max(0.0, duration - grid_start) / step_seconds - 1e-9)
+        next_beat = grid_start + steps_due * step_seconds - duration
+
+        return {
+            "dance_sequence": sequence,
+            "metadata": {
+                "dance_style": genre,
+                "tempo": tempo,
+                "starting_point": "start",
+                "music_features": {"BPM": bpm, "Key": key, "Emotion": emotion},
+                "video_generation_notes": "Generated offline by the local choreographer",
+                "end_pose": sequence[-1]["pose_name"],
+                "next_beat": round(next_beat, 3)
+            }
+        }
+
+    def generate_json(self, genre: str, bpm: float, **kwargs) -> str:
+        """Generate a dance sequence and serialise it like an LLM response"""
+        return json.dumps(self.generate(genre, bpm, **kwargs), indent=2)
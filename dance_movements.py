@@ -394,4 +394,22 @@ class DanceMovements:
             "timing": "4.0",
             "frames": ["step_right_arms_side", "leap_execute"]
         }
-    ] 
\ No newline at end of file
+    ] 
+
+    # Hand-written sequences keyed by the genre names offered in the UI
+    SEQUENCES = {
+        "Tap Dance": TAP_DANCE,
+        "Broadway": BROADWAY,
+        "Hip Hop": HIP_HOP,
+        "Contemporary": CONTEMPORARY
+    }
+
+    @classmethod
+    def genre_poses(cls, genre: str) -> List[str]:
+        """Return the pose names used by a genre's sequence, in first-use order"""
+        poses = []
+        for step in cls.SEQUENCES[genre]:
+            for pose in step["frames"]:
+                if pose not in poses:
+                    poses.append(pose)
+        return poses
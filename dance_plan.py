@@ -0,0 +1,205 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+import numpy as np
+from dance_movements import DanceMovements, Position
+
+MOVEMENT_TYPES = ("static", "dynamic")
+
+# Joint order used for every row of a render plan
+JOINTS = ("head", "body", "left_arm", "right_arm", "left_leg", "right_leg")
+
+_TIMECODE = re.compile(r"^(\d+):([0-5]?\d):([0-5]?\d(?:\.\d+)?)$")
+_STOPWORDS = {"a", "an", "and", "the", "to", "with", "of", "in", "into", "on", "pose", "move"}
+
+@dataclass
+class DanceStep:
+    start: float          # Seconds from the start of the sequence
+    duration: float       # Seconds the step lasts
+    pose: str             # Key into the DanceMovements pose table
+    pose_name: str        # Pose name as written by the choreographer
+    movement_type: str    # "static" or "dynamic"
+
+@dataclass
+class RenderPlan:
+    dance_style: str
+    fps: int
+    width: int
+    height: int
+    joints: np.ndarray    # (frames, len(JOINTS), 2) int16 pixel coordinates
+    steps: List[DanceStep]
+
+    def __len__(self) -> int:
+        return len(self.joints)
+
+    @property
+    def duration(self) -> float:
+        """Length of the plan in seconds"""
+        return len(self.joints) / self.fps
+
+def extract_json(response: str) -> dict:
+    """Parse a JSON object out of an LLM response, ignoring markdown fences and chatter"""
+    start, end = response.find("{"), response.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("Response does not contain a JSON object")
+    try:
+        return json.loads(response[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Response is not valid JSON: {e}")
+
+def parse_timecode(value: Union[str, int, float]) -> float:
+    """Convert an HH:MM:SS(.fff) timecode, or a plain number of seconds, to seconds"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = float(value)
+    else:
+        match = _TIMECODE.match(str(value).strip())
+        if not match:
+            raise ValueError(f"Invalid timecode {value!r}, expected HH:MM:SS")
+        hours, minutes, secs = match.groups()
+        seconds = int(hours) * 3600 + int(minutes) * 60 + float(secs)
+    if seconds < 0:
+        raise ValueError(f"Timecode {value!r} is negative")
+    return seconds
+
+def format_timecode(seconds: float) -> str:
+    """Format seconds as an HH:MM:SS timecode, keeping hundredths when present"""
+    hours, rest = divmod(round(seconds, 2), 3600)
+    minutes, secs = divmod(rest, 60)
+    if abs(secs - round(secs)) < 0.005:
+        return f"{int(hours):02d}:{int(minutes):02d}:{int(round(secs)):02d}"
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:05.2f}"
+
+def validate_dance_sequence(data: dict) -> List[dict]:
+    """Check the `dance_sequence` array against the schema requested in the prompt"""
+    sequence = data.get("dance_sequence") if isinstance(data, dict) else None
+    if not isinstance(sequence, list) or not sequence:
+        raise ValueError("JSON must contain a non-empty `dance_sequence` array")
+
+    for index, entry in enumerate(sequence):
+        if not isinstance(entry, dict):
+            raise ValueError(f"dance_sequence[{index}] must be an object")
+        for field in ("timestamp", "duration", "pose_name", "movement_type"):
+            if field not in entry:
+                raise ValueError(f"dance_sequence[{index}] is missing `{field}`")
+        try:
+            parse_timecode(entry["timestamp"])
+            if parse_timecode(entry["duration"]) <= 0:
+                raise ValueError("duration must be positive")
+        except ValueError as e:
+            raise ValueError(f"dance_sequence[{index}]: {e}")
+        if str(entry["movement_type"]).strip().lower() not in MOVEMENT_TYPES:
+            raise ValueError(
+                f"dance_sequence[{index}]: movement_type must be one of {MOVEMENT_TYPES}, "
+                f"got {entry['movement_type']!r}"
+            )
+    return sequence
+
+def _tokens(text: str) -> set:
+    return {t for t in re.split(r"[^a-z0-9]+", text.lower()) if t and t not in _STOPWORDS}
+
+def match_pose(pose_name: str, description: str, genre: str, pose_table: Dict[str, Position],
+               index: int = 0) -> str:
+    """
+    Map a free-form pose name onto a key of the pose table.
+
+    Exact (snake_cased) names win; otherwise the genre's poses are scored by word
+    overlap with the name, then the description. With no overlap at all the genre's
+    hand-written sequence is cycled so the figure keeps moving.
+    """
+    key = "_".join(re.split(r"[^a-z0-9]+", pose_name.lower())).strip("_")
+    if key in pose_table:
+        return key
+
+    genre_poses = DanceMovements.genre_poses(genre)
+    for text in (pose_name, description):
+        words = _tokens(text or "")
+        if not words:
+            continue
+        best, best_score = None, 0.0
+        for pose in genre_poses:
+            pose_words = set(pose.split("_"))
+            score = len(words & pose_words) / len(pose_words)
+            if score > best_score:
+                best, best_score = pose, score
+        if best:
+            return best
+    return genre_poses[index % len(genre_poses)]
+
+def parse_dance_sequence(response: Union[str, dict], genre: str,
+                         pose_table: Dict[str, Position]) -> List[DanceStep]:
+    """Validate an LLM dance sequence and resolve every entry to a known pose"""
+    data = extract_json(response) if isinstance(response, str) else response
+    steps = []
+    for index, entry in enumerate(validate_dance_sequence(data)):
+        pose_name = str(entry["pose_name"])
+        steps.append(DanceStep(
+            start=parse_timecode(entry["timestamp"]),
+            duration=parse_timecode(entry["duration"]),
+            pose=match_pose(pose_name, str(entry.get("pose_description", "")), genre, pose_table, index),
+            pose_name=pose_name,
+            movement_type=str(entry["movement_type"]).strip().lower()
+        ))
+    steps.sort(key=lambda step: step.start)
+    return steps
+
+def pose_array(pos: Position) -> np.ndarray:
+    """Flatten a Position into a (len(JOINTS), 2) coordinate array"""
+    return np.array([pos.head, pos.body, *pos.arms, *pos.legs], dtype=np.float64)
+
+def compile_render_plan(steps: List[DanceStep], dance_style: str, pose_table: Dict[str, Position],
+                        easing: Callable[[float], float], hold_frames: int, fps: int,
+                        width: int, height: int, initial_pose: Optional[str] = None) -> RenderPlan:
+    """
+    Lay the steps out on a frame timeline and precompute every frame's joint coordinates.
+
+    Dynamic steps ease from the previous pose across the whole step, leaving
+    `hold_frames` at the end; static steps settle within `hold_frames` and hold.
+    Gaps between steps, and steps shorter than a frame, hold the previous pose.
+    """
+    if not steps:
+        raise ValueError("Cannot compile an empty dance sequence")
+    initial_pose = initial_pose or steps[0].pose
+    arrays = {pose: pose_array(pose_table[pose])
+              for pose in {step.pose for step in steps} | {initial_pose}}
+
+    segments = []
+    current = arrays[initial_pose]
+    cursor = 0
+    last_end = 0
+    for step in steps:
+        # Frame boundaries come from absolute time so rounding never accumulates into drift
+        start = max(cursor, int(round(step.start * fps)))
+        end = int(round((step.start + step.duration) * fps))
+        last_end = max(last_end, end)
+        if end <= start:
+            continue  # Shorter than a frame or covered by the previous step
+        if start > cursor:
+            segments.append(np.repeat(current[None], start - cursor, axis=0))
+        total = end - start
+        if step.movement_type == "dynamic":
+            moving = max(1, total - hold_frames)
+        else:
+            moving = max(1, min(hold_frames, total))
+
+        target = arrays[step.pose]
+        if moving > 1:
+            progress = np.array([easing(frame / (moving - 1)) for frame in range(moving)])
+        else:
+            progress = np.ones(1)
+        segments.append(current + (target - current) * progress[:, None, None])
+        if total > moving:
+            segments.append(np.repeat(target[None], total - moving, axis=0))
+        current = target
+        cursor = end
+
+    # A trailing step too short to get its own frames still extends the timeline: hold
+    if last_end > cursor:
+        segments.append(np.repeat(current[None], last_end - cursor, axis=0))
+    if not segments:
+        raise ValueError("Dance sequence is shorter than one frame")
+    joints = np.concatenate(segments).astype(np.int16)
+    if len(joints) != last_end:
+        raise ValueError(f"Compiled {len(joints)} frames, expected {last_end} from the sequence timing")
+    return RenderPlan(dance_style=dance_style, fps=fps, width=width, height=height,
+                      joints=joints, steps=steps)
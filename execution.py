@@ -0,0 +1,196 @@
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from logger_service import LoggerService
+from metrics import capture_spans, in_current_context, replay_spans
+from profiling import capture_profile, disable_sampling, is_profiling, merge_profile
+
+logger = LoggerService()
+
+# CPU-bound stages (librosa analysis, frame rendering/encoding) run in worker processes,
+# I/O-bound stages (OpenAI, Replicate) in threads. Each pool is sized independently.
+CPU_WORKERS = int(os.getenv("BOUNCY_CPU_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+IO_WORKERS = int(os.getenv("BOUNCY_IO_WORKERS", "16"))
+# Requests admitted into the pipeline at once; the rest are turned away immediately
+MAX_IN_FLIGHT = int(os.getenv("BOUNCY_MAX_IN_FLIGHT", str(4 * CPU_WORKERS)))
+# BOUNCY_INLINE_STAGES=1 runs every stage in the calling thread (debugging, benchmarks)
+INLINE = os.getenv("BOUNCY_INLINE_STAGES") == "1"
+
+class PipelineBusy(Exception):
+    """Raised when a request arrives while MAX_IN_FLIGHT requests are already running"""
+
+def _init_cpu_worker(log_queue):
+    """Prepare a CPU worker process: parent-side logging, persistent JIT caches and optional warm-up"""
+    global INLINE
+    INLINE = True  # Stages nested inside a worker run in place
+    disable_sampling()  # Stages are profiled when the parent's request is, see _run_in_worker
+    # Only the parent writes (and rotates) the log file
+    LoggerService().forward_to(log_queue)
+    from warmup import configure_caches, warm_up
+    configure_caches()
+    if os.getenv("BOUNCY_WARMUP") == "1":
+        warm_up()
+
+def _run_in_worker(fn: Callable, args: tuple, kwargs: dict, profiled: bool = False):
+    """
+    Run a CPU stage in a worker process, returning its result, its spans and, when the
+    calling request is profiled, its profile stats for the parent to replay
+    """
+    if not profiled:
+        return (*capture_spans(fn, *args, **kwargs), None)
+    (result, spans), stats = capture_profile(capture_spans, fn, *args, **kwargs)
+    return result, spans, stats
+
+class StageExecutor:
+    """Routes pipeline stages to a process pool (CPU) or a thread pool (I/O) with admission control"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(StageExecutor, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self._lock = threading.Lock()
+        self._cpu_pool: Optional[Executor] = None
+        self._io_pool: Optional[Executor] = None
+        self._slots = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+        self._counts = {"in_flight": 0, "cpu": 0, "io": 0}
+
+    def _pool(self, stage: str) -> Executor:
+        with self._lock:
+            if stage == "cpu":
+                if self._cpu_pool is None:
+                    # spawn: forking a process that already runs Gradio/uvicorn threads is unsafe
+                    self._cpu_pool = ProcessPoolExecutor(
+                        max_workers=CPU_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_cpu_worker,
+                        initargs=(logger.worker_queue(),)
+                    )
+                return self._cpu_pool
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io-stage")
+            return self._io_pool
+
+    def _drop_cpu_pool(self, pool: Executor):
+        """Forget a broken CPU pool so the next stage starts a fresh one"""
+        with self._lock:
+            if self._cpu_pool is not pool:
+                return  # Already replaced after another stage saw it break
+            self._cpu_pool = None
+        logger.warning("A CPU worker died; restarting the CPU process pool")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """
+        Create the pools now and wait until every CPU worker has started.
+
+        Each worker runs _init_cpu_worker (including warm-up with BOUNCY_WARMUP=1) before
+        taking its first task, so priming them here keeps process spawn and warm-up off
+        the first requests.
+        """
+        if INLINE:
+            return
+        pool = self._pool("cpu")
+        self._pool("io")
+        for future in [pool.submit(os.getpid) for _ in range(CPU_WORKERS)]:
+            future.result()
+        logger.info(f"Started {CPU_WORKERS} CPU workers and up to {IO_WORKERS} I/O threads")
+
+    def _count(self, key: str, delta: int):
+        with self._lock:
+            self._counts[key] += delta
+
+    def pending(self) -> Dict[str, int]:
+        """Requests in flight and stage calls queued or running, per pool"""
+        with self._lock:
+            return dict(self._counts)
+
+    @contextmanager
+    def admit(self):
+        """Reserve a pipeline slot for one request, or raise PipelineBusy if none is free"""
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"Rejecting request: {MAX_IN_FLIGHT} already in flight")
+            raise PipelineBusy(f"{MAX_IN_FLIGHT} requests are already being processed, please retry shortly")
+        self._count("in_flight", 1)
+        try:
+            yield
+        finally:
+            self._count("in_flight", -1)
+            self._slots.release()
+
+    def submit(self, stage: str, fn: Callable, *args, **kwargs) -> Future:
+        """Queue fn on the pool for `stage` ("cpu" or "io")"""
+        if INLINE:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        self._count(stage, 1)
+        if stage == "io":
+            # Threads share the request context, so spans still land in the request summary
+            future = self._pool(stage).submit(in_current_context(fn), *args, **kwargs)
+            future.add_done_callback(lambda _: self._count(stage, -1))
+            return future
+
+        # Spans (and the profile of a sampled request) recorded in the worker process come
+        # back with the result and are replayed into this process and the caller's request
+        context = contextvars.copy_context()
+        future = Future()
+
+        def done(worker_future: Future):
+            self._count(stage, -1)
+            try:
+                result, spans, stats = worker_future.result()
+            except BrokenProcessPool as e:
+                # Every stage queued on the pool fails with it; later stages get a new pool
+                self._drop_cpu_pool(pool)
+                future.set_exception(e)
+                return
+            except BaseException as e:
+                future.set_exception(e)
+                return
+            context.run(replay_spans, spans)
+            context.run(merge_profile, stats)
+            future.set_result(result)
+
+        call = (_run_in_worker, fn, args, kwargs, is_profiling())
+        pool = self._pool(stage)
+        try:
+            try:
+                worker_future = pool.submit(*call)
+            except BrokenProcessPool:
+                # Broken by a stage that has not reported back yet; nothing ran, so resubmit
+                self._drop_cpu_pool(pool)
+                pool = self._pool(stage)
+                worker_future = pool.submit(*call)
+        except BaseException:
+            self._count(stage, -1)
+            raise
+        worker_future.add_done_callback(done)
+        return future
+
+    def run_cpu(self, fn: Callable, *args, **kwargs):
+        """Run a CPU-bound stage in the process pool and wait for its result"""
+        return self.submit("cpu", fn, *args, **kwargs).result()
+
+    def run_io(self, fn: Callable, *args, **kwargs):
+        """Run an I/O-bound stage in the thread pool and wait for its result"""
+        return self.submit("io", fn, *args, **kwargs).result()
+
+    def shutdown(self):
+        """Stop both pools, dropping stage calls that have not started yet"""
+        with self._lock:
+            for pool in (self._cpu_pool, self._io_pool):
+                if pool is not None:
+                    pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = self._io_pool = None
@@ -0,0 +1,83 @@
+"""
+Report the cold-start import cost of each BouncyBot subsystem.
+
+Each subsystem is imported in a fresh interpreter so results are not skewed by
+modules another subsystem already loaded. Run with:
+
+    python import_report.py [--json] [--top N]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules that make up each subsystem; app itself should stay light
+SUBSYSTEMS = {
+    "core": ["app"],
+    "ui": ["gradio"],
+    # librosa loads its submodules lazily; touch the ones the analysis uses
+    "analysis": ["audio_analysis", "librosa.beat", "librosa.feature"],
+    "llm": ["llm_client"],
+    "rendering": ["stick_figure_animator", "video_generators", "cv2"],
+    "remote": ["replicate", "requests"]
+}
+
+_PROBE = """
+import json, resource, time
+start = time.perf_counter()
+{imports}
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}}))
+"""
+
+def parse_importtime(stderr: str, top: int) -> list:
+    """Return the `top` most expensive packages from -X importtime output, by total self time"""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    entries = [{"package": package, "seconds": us / 1e6} for package, us in packages.items()]
+    entries.sort(key=lambda entry: entry["seconds"], reverse=True)
+    return entries[:top]
+
+def measure(modules: list, top: int = 5) -> dict:
+    """Import `modules` in a fresh interpreter and return its timing and memory"""
+    code = _PROBE.format(imports="\n".join(f"import {module}" for module in modules))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=Path(__file__).parent, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {"modules": modules, "error": result.stderr.strip().splitlines()[-1]}
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["modules"] = modules
+    report["slowest"] = parse_importtime(result.stderr, top)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--top", type=int, default=5, help="slowest packages listed per subsystem")
+    args = parser.parse_args()
+
+    report = {name: measure(modules, args.top) for name, modules in SUBSYSTEMS.items()}
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for name, entry in report.items():
+        if "error" in entry:
+            print(f"{name:<10} failed: {entry['error']}")
+            continue
+        print(f"{name:<10} {entry['seconds']:6.2f}s  {entry['max_rss_mb']:7.1f} MB  ({', '.join(entry['modules'])})")
+        for item in entry["slowest"]:
+            print(f"{'':<12}{item['seconds']:6.2f}s  {item['package']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Headless HTTP job API for the BouncyBot pipeline.
+
+    POST /jobs                 multipart: audio, genre, [choreographer], [full_song] -> 202 {"id": ...}
+    GET  /jobs/{id}            status, current stage and progress
+    GET  /jobs/{id}/events     server-sent events, one per stage change, until the job ends
+    GET  /jobs/{id}/sequence   the generated dance sequence JSON
+    GET  /jobs/{id}/video      the rendered MP4
+
+Jobs wait in an asyncio queue and are drained by JOB_CONCURRENCY consumer tasks, so a
+queued job or an open event stream costs a dict entry, not a thread. Each running job
+calls the same process_audio / process_full_song used by the Gradio UI.
+"""
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from logger_service import LoggerService
+from dance_movements import DanceMovements
+from execution import PipelineBusy
+import app as pipeline
+
+logger = LoggerService()
+
+# Jobs processed at once; keep at or below BOUNCY_MAX_IN_FLIGHT to leave room for the UI
+JOB_CONCURRENCY = int(os.getenv("BOUNCY_JOB_CONCURRENCY", "4"))
+# Jobs allowed to wait; further submissions get 503
+JOB_QUEUE_SIZE = int(os.getenv("BOUNCY_JOB_QUEUE_SIZE", "10000"))
+# Finished jobs are forgotten (files are kept) after this many seconds
+JOB_TTL = float(os.getenv("BOUNCY_JOB_TTL", "3600"))
+# Delay before retrying a job the pipeline turned away with PipelineBusy
+BUSY_RETRY_SECONDS = 1.0
+JOB_UPLOAD_DIR = Path(pipeline.UPLOAD_DIR) / "jobs"
+
+@dataclass
+class Job:
+    id: str
+    genre: str
+    choreographer: str
+    full_song: bool
+    audio_path: str
+    status: str = "queued"  # queued, running, succeeded, failed
+    stage: str = "Queued"
+    progress: float = 0.0
+    message: Optional[str] = None
+    json_path: Optional[str] = None
+    video_path: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    updated: float = field(default_factory=time.time)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def update(self, **changes):
+        """Apply changes and wake every event stream waiting on this job (event loop thread only)"""
+        for name, value in changes.items():
+            setattr(self, name, value)
+        self.updated = time.time()
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @property
+    def changed(self) -> asyncio.Event:
+        """Event set on the next update; fetch it before reading state so no update is missed"""
+        return self._changed
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "message": self.message,
+            "genre": self.genre,
+            "choreographer": self.choreographer,
+            "full_song": self.full_song,
+            "created": self.created,
+            "updated": self.updated
+        }
+
+class JobQueue:
+    """In-memory job store plus the asyncio queue and consumer tasks that drain it"""
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY, max_size: int = JOB_QUEUE_SIZE):
+        self.concurrency = concurrency
+        self.jobs: Dict[str, Job] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._workers = []
+
+    def start(self):
+        JOB_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job: Job):
+        """Queue a job; raises asyncio.QueueFull when JOB_QUEUE_SIZE jobs are already waiting"""
+        self._purge()
+        self._queue.put_nowait(job.id)
+        self.jobs[job.id] = job
+        logger.info(f"Queued job {job.id}", job=job.id, queued=self._queue.qsize())
+
+    def _purge(self):
+        cutoff = time.time() - JOB_TTL
+        for job_id in [job.id for job in self.jobs.values() if job.finished and job.updated < cutoff]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = self.jobs.get(await self._queue.get())
+            try:
+                if job is not None:
+                    await self._run(job)
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}", job=job.id)
+                job.update(status="failed", message=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        loop = asyncio.get_running_loop()
+
+        def progress(fraction: float, desc: str):
+            # Called from the pipeline thread; job state is only touched on the event loop
+            loop.call_soon_threadsafe(lambda: job.update(stage=desc, progress=round(fraction, 3)))
+
+        process = pipeline.process_full_song if job.full_song else pipeline.process_audio
+        job.update(status="running", stage="Starting")
+        while True:
+            try:
+                message, json_output, video_path = await loop.run_in_executor(
+                    None, lambda: process(os.getenv("OPENAI_API_KEY", ""), job.genre, job.audio_path,
+                                          job.choreographer, progress=progress)
+                )
+                break
+            except PipelineBusy:
+                job.update(stage="Waiting for a free pipeline slot")
+                await asyncio.sleep(BUSY_RETRY_SECONDS)
+
+        if video_path is None:
+            job.update(status="failed", stage="Failed", message=message)
+            return
+        suffix = "_full" if job.full_song else ""
+        json_path = os.path.join(pipeline.VIDEO_DIR, f"{Path(job.audio_path).stem}_{job.genre}{suffix}.json")
+        job.update(status="succeeded", stage="Done", progress=1.0, message=message,
+                   json_path=json_path, video_path=video_path)
+
+def create_api(jobs: Optional[JobQueue] = None) -> FastAPI:
+    """
+    Build the FastAPI application serving the job endpoints.
+
+    Args:
+        jobs (JobQueue, optional): Job store to serve; a new one is created by default.
+
+    Returns:
+        FastAPI: Application whose startup starts the job consumers.
+    """
+    jobs = jobs or JobQueue()
+
+    @asynccontextmanager
+    async def lifespan(api: FastAPI):
+        jobs.start()
+        try:
+            yield
+        finally:
+            await jobs.stop()
+
+    api = FastAPI(title="BouncyBot jobs", lifespan=lifespan)
+    api.state.jobs = jobs
+
+    def get_job(job_id: str) -> Job:
+        job = jobs.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+        return job
+
+    def get_finished(job_id: str) -> Job:
+        job = get_job(job_id)
+        if job.status != "succeeded":
+            raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+        return job
+
+    @api.post("/jobs", status_code=202)
+    async def submit_job(audio: UploadFile = File(...), genre: str = Form(...),
+                         choreographer: str = Form(pipeline.CHOREOGRAPHERS[0]),
+                         full_song: bool = Form(False)):
+        if genre not in DanceMovements.SEQUENCES:
+            raise HTTPException(status_code=422, detail=f"genre must be one of {list(DanceMovements.SEQUENCES)}")
+        if choreographer not in pipeline.CHOREOGRAPHERS:
+            raise HTTPException(status_code=422, detail=f"choreographer must be one of {pipeline.CHOREOGRAPHERS}")
+
+        job_id = uuid.uuid4().hex
+        # The job id names the upload, so its JSON and video paths never collide with other jobs
+        audio_path = JOB_UPLOAD_DIR / f"{job_id}{Path(audio.filename or '').suffix or '.wav'}"
+        with open(audio_path, "wb") as f:
+            await run_in_threadpool(shutil.copyfileobj, audio.file, f)
+        job = Job(job_id, genre, choreographer, full_song, str(audio_path))
+        try:
+            jobs.submit(job)
+        except asyncio.QueueFull:
+            audio_path.unlink(missing_ok=True)
+            raise HTTPException(status_code=503, detail="Job queue is full, please retry later")
+        return job.to_dict()
+
+    @api.get("/jobs/{job_id}")
+    async def job_status(job_id: str):
+        return get_job(job_id).to_dict()
+
+    @api.get("/jobs/{job_id}/events")
+    async def job_events(job_id: str):
+        job = get_job(job_id)
+
+        async def stream():
+            while True:
+                changed = job.changed
+                yield f"data: {json.dumps(job.to_dict())}\n\n"
+                if job.finished:
+                    return
+                await changed.wait()
+
+        return StreamingResponse(stream(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+
+    @api.get("/jobs/{job_id}/sequence")
+    async def job_sequence(job_id: str):
+        return FileResponse(get_finished(job_id).json_path, media_type="application/json")
+
+    @api.get("/jobs/{job_id}/video")
+    async def job_video(job_id: str):
+        return FileResponse(get_finished(job_id).video_path, media_type="video/mp4")
+
+    return api
@@ -0,0 +1,116 @@
+import os
+from openai import OpenAI
+from metrics import span
+
+# Seconds to wait on OpenAI before falling back to the local choreographer
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+
+def format_prompt(genre: str, tempo: str, bpm: float, key: str, emotion: str,
+                  starting_point: str = None, start_pose: str = None, end_pose: str = None) -> str:
+    """
+    Format the prompt dynamically based on audio features.
+
+    Args:
+        genre (str): The dance genre (e.g., Hip Hop, Contemporary).
+        tempo (str): The tempo of the music (e.g., Slow, Moderate, Fast).
+        bpm (float): Beats per minute of the audio.
+        key (str): The musical key (e.g., C Major, D Minor).
+        emotion (str): The emotional tone of the music (e.g., Energetic, Dramatic).
+        starting_point (str, optional): Where the snippet sits in the song (start, middle or end).
+        start_pose (str, optional): Pose the previous snippet ends in; the sequence must begin with it.
+        end_pose (str, optional): Pose the next snippet begins with; the sequence must end with it.
+
+    Returns:
+        str: The formatted prompt.
+    """
+    prompt_template = """
+    Generate a JSON object that represents a professional 5-second dance sequence, suitable for use in text-to-video generation.
+
+    Here are the requirements:
+    1. The output must always follow the same JSON format, including a `dance_sequence` array and `metadata`.
+    2. Each entry in the `dance_sequence` must:
+       - Have a `timestamp` (start time of the pose in HH:MM:SS format) and a `duration` (duration of the pose in HH:MM:SS format).
+       - Include a `pose_name` (brief, professional name of the pose).
+       - Contain a `pose_description` (detailed explanation of the pose and movements).
+       - Specify `movement_type` as either "static" or "dynamic".
+       - Include `transition_to_next` (a clear description of how to move into the next pose seamlessly).
+    3. The total duration of the sequence must not exceed 5 seconds.
+    4. The sequence should focus on professional dance movements, with smooth transitions and precise details.
+    5. The JSON must include a `metadata` section that specifies:
+       - `dance_style`: {genre}
+       - `tempo`: {tempo}
+       - `starting_point`: Whether the snippet represents the start, middle, or end of the dance.
+       - `music_features`: The musical context, including:
+         - BPM = {bpm}
+         - Key = {key}
+         - Emotion = {emotion}.
+       - `video_generation_notes`: Any important considerations for generating the video accurately.
+
+    For this request, use the following music details:
+    - Dance Style: {genre}
+    - Tempo: {tempo}
+    - BPM: {bpm}
+    - Key: {key}
+    - Emotion: {emotion}
+
+    Generate smooth, professional, and creative movements that fit the style and tone of the specified music. Ensure logical and seamless transitions between poses.
+    """
+    prompt = prompt_template.format(
+        genre=genre, tempo=tempo, bpm=bpm, key=key, emotion=emotion
+    )
+    if starting_point:
+        prompt += f"\n    This snippet is the {starting_point} of the dance; set `starting_point` accordingly.\n"
+    if start_pose:
+        prompt += f"    The previous snippet ends in the pose `{start_pose}`: use it as the first `pose_name`.\n"
+    if end_pose:
+        prompt += f"    The next snippet begins in the pose `{end_pose}`: use it as the last `pose_name`.\n"
+    return prompt
+
+def call_openai_api(api_key: str, genre: str, audio_file: str, features: dict = None,
+                    starting_point: str = None, start_pose: str = None, end_pose: str = None) -> str:
+    """
+    Call OpenAI API to generate a JSON dance sequence based on audio features and genre.
+
+    Args:
+        api_key (str): OpenAI API key.
+        genre (str): Selected dance genre.
+        audio_file (str): Path to the uploaded audio file.
+        features (dict, optional): Already extracted audio features.
+        starting_point (str, optional): Where the snippet sits in the song.
+        start_pose (str, optional): Pose the snippet must begin with.
+        end_pose (str, optional): Pose the snippet must end with.
+
+    Returns:
+        str: JSON response from the API.
+    """
+    # Extract audio features using the provided function
+    if features is None:
+        from audio_analysis import extract_audio_features
+        features = extract_audio_features(audio_file)
+    # Format the prompt dynamically
+    prompt = format_prompt(
+        genre=genre,
+        tempo=features["tempo"],
+        bpm=features["bpm"],
+        key=features["key"],
+        emotion=features["emotion"],
+        starting_point=starting_point,
+        start_pose=start_pose,
+        end_pose=end_pose
+    )
+
+    #Call the OpenAI API
+    # No SDK retries: they would stretch the fallback deadline to several times OPENAI_TIMEOUT
+    client = OpenAI(api_key=api_key, timeout=OPENAI_TIMEOUT, max_retries=0)
+    with span("openai"):
+        chat_response = client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a JSON generator for professional dance sequences."},
+                {"role": "user", "content": prompt}
+            ]
+        )
+
+    # Extract and return the generated JSON
+    return chat_response.choices[0].message.content
+    # return "This is working"
@@ -1,58 +1,176 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
 from datetime import datetime
 from pathlib import Path
 
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps exceptions structured.
+
+    The stock prepare() folds the formatted traceback into the message and clears the
+    exception fields; this keeps the message as getMessage() and the traceback in
+    exc_text, so formatters on the listener side (e.g. JsonFormatter) still see it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
 class LoggerService:
+    """
+    Application-wide logger.
+
+    Behaviour is configured through environment variables:
+        BOUNCY_LOG_QUEUE: "1" (default) hands records to a background listener thread
+            so callers never block on disk or console I/O; "0" logs synchronously.
+        BOUNCY_LOG_ROTATION: "date" (default) rotates at midnight, "size" rotates at
+            BOUNCY_LOG_MAX_BYTES (default 10 MB).
+        BOUNCY_LOG_BACKUPS: Number of rotated files to keep (default 7).
+        BOUNCY_LOG_JSON: "1" writes structured JSON records instead of plain text.
+
+    Only one process may write and rotate the log file: worker processes call
+    forward_to() with the parent's worker_queue() so the parent writes their records.
+    """
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(LoggerService, cls).__new__(cls)
             cls._instance._initialize_logger()
         return cls._instance
-    
+
     def _initialize_logger(self):
         """Initialize the logger with file and console handlers"""
         self.logger = logging.getLogger('BouncyBot')
         self.logger.setLevel(logging.INFO)
-        
+        self.listener = None
+        self.worker_listener = None
+        self._worker_queue = None
+
         # Create logs directory if it doesn't exist
         log_dir = Path("logs")
         log_dir.mkdir(exist_ok=True)
-        
-        # Create file handler with current date
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        file_handler = logging.FileHandler(
-            f"logs/bouncy_bot_{current_date}.log",
-            encoding='utf-8'
-        )
+
+        # Create rotating file handler
+        backups = int(os.getenv("BOUNCY_LOG_BACKUPS", "7"))
+        if os.getenv("BOUNCY_LOG_ROTATION", "date") == "size":
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_dir / "bouncy_bot.log",
+                maxBytes=int(os.getenv("BOUNCY_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+                backupCount=backups,
+                encoding='utf-8',
+                delay=True
+            )
+        else:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                log_dir / "bouncy_bot.log",
+                when="midnight",
+                backupCount=backups,
+                encoding='utf-8',
+                delay=True  # Opened on first write, so processes that forward_to() never touch it
+            )
         file_handler.setLevel(logging.INFO)
-        
+
         # Create console handler
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
-        
+
         # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        if os.getenv("BOUNCY_LOG_JSON") == "1":
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
-        
-        # Add handlers to logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-    
-    def info(self, message: str):
-        """Log info level message"""
-        self.logger.info(message)
-    
-    def error(self, message: str, exc_info=None):
+        self.handlers = [file_handler, console_handler]
+
+        if os.getenv("BOUNCY_LOG_QUEUE", "1") == "1":
+            # Callers only enqueue; the listener thread does the I/O
+            log_queue = queue.SimpleQueue()
+            self.logger.addHandler(RecordQueueHandler(log_queue))
+            self.listener = logging.handlers.QueueListener(
+                log_queue, file_handler, console_handler, respect_handler_level=True
+            )
+            self.listener.start()
+            atexit.register(self.shutdown)
+        else:
+            # Add handlers to logger
+            self.logger.addHandler(file_handler)
+            self.logger.addHandler(console_handler)
+
+    def worker_queue(self):
+        """
+        Queue that worker processes send their records to, written by this process's handlers.
+
+        Returns:
+            multiprocessing.Queue: Pass to worker processes for forward_to().
+        """
+        if self._worker_queue is None:
+            self._worker_queue = multiprocessing.get_context("spawn").Queue()
+            self.worker_listener = logging.handlers.QueueListener(
+                self._worker_queue, *self.handlers, respect_handler_level=True
+            )
+            self.worker_listener.start()
+            atexit.register(self.shutdown)
+        return self._worker_queue
+
+    def forward_to(self, log_queue):
+        """Send this process's records to another process's worker_queue() instead of writing them"""
+        self.shutdown()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        for handler in self.handlers:
+            handler.close()
+        self.logger.addHandler(RecordQueueHandler(log_queue))
+
+    def shutdown(self):
+        """Flush queued records and stop the listener threads"""
+        for name in ("listener", "worker_listener"):
+            listener = getattr(self, name)
+            if listener is not None:
+                listener.stop()
+                setattr(self, name, None)
+
+    def info(self, message: str, **fields):
+        """Log info level message with optional structured fields"""
+        self.logger.info(message, extra={"fields": fields})
+
+    def error(self, message: str, exc_info=None, **fields):
         """Log error level message with optional exception info"""
-        self.logger.error(message, exc_info=exc_info)
-    
-    def warning(self, message: str):
-        """Log warning level message"""
-        self.logger.warning(message) 
\ No newline at end of file
+        self.logger.error(message, exc_info=exc_info, extra={"fields": fields})
+
+    def warning(self, message: str, **fields):
+        """Log warning level message with optional structured fields"""
+        self.logger.warning(message, extra={"fields": fields})
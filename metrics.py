@@ -0,0 +1,174 @@
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from logger_service import LoggerService
+from profiling import profile_task
+
+logger = LoggerService()
+
+# Upper bounds in seconds of the latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+STAGE_METRIC = "bouncy_stage_duration_seconds"
+REQUEST_METRIC = "bouncy_request_duration_seconds"
+_HELP = {
+    STAGE_METRIC: "Time spent in each pipeline stage",
+    REQUEST_METRIC: "End-to-end time of each request type"
+}
+_LABEL = {STAGE_METRIC: "stage", REQUEST_METRIC: "request"}
+
+# Spans recorded by the request currently running in this context
+_request_spans: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = \
+    contextvars.ContextVar("request_spans", default=None)
+
+class Histogram:
+    """Cumulative-bucket latency histogram, safe to update from several threads"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+class MetricsRegistry:
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, label: str, seconds: float):
+        """Record one duration for the given metric and label value"""
+        histogram = self.histograms.get((metric, label))
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault((metric, label), Histogram())
+        histogram.observe(seconds)
+
+    def render_prometheus(self) -> str:
+        """Render every histogram in the Prometheus text exposition format"""
+        lines = []
+        for metric in (STAGE_METRIC, REQUEST_METRIC):
+            lines.append(f"# HELP {metric} {_HELP[metric]}")
+            lines.append(f"# TYPE {metric} histogram")
+            for (name, label), histogram in sorted(self.histograms.items()):
+                if name != metric:
+                    continue
+                counts, total, count = histogram.snapshot()
+                labels = f'{_LABEL[metric]}="{label}"'
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS, counts):
+                    cumulative += bucket
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f"{metric}_sum{{{labels}}} {total}")
+                lines.append(f"{metric}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+@contextmanager
+def span(stage: str):
+    """
+    Time a pipeline stage and record it in the stage histogram and the current request.
+
+    Works as a context manager or, like any contextmanager, as a function decorator.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_span(stage, time.perf_counter() - start)
+
+def _record_span(stage: str, elapsed: float):
+    REGISTRY.observe(STAGE_METRIC, stage, elapsed)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((stage, elapsed))
+
+def capture_spans(func: Callable, *args, **kwargs) -> Tuple[object, List[Tuple[str, float]]]:
+    """Call func and return its result with the spans it recorded, e.g. inside a worker process"""
+    spans: List[Tuple[str, float]] = []
+    token = _request_spans.set(spans)
+    try:
+        return func(*args, **kwargs), spans
+    finally:
+        _request_spans.reset(token)
+
+def replay_spans(spans: List[Tuple[str, float]]):
+    """Record spans captured by capture_spans in this process's registry and current request"""
+    for stage, elapsed in spans:
+        _record_span(stage, elapsed)
+
+@contextmanager
+def request_timer(request: str):
+    """
+    Collect the spans of one request and log a per-stage summary when it finishes.
+
+    Nested request timers are folded into the outermost one.
+    """
+    if _request_spans.get() is not None:
+        yield
+        return
+    spans: List[Tuple[str, float]] = []
+    token = _request_spans.set(spans)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - start
+        _request_spans.reset(token)
+        REGISTRY.observe(REQUEST_METRIC, request, total)
+        stages: Dict[str, float] = {}
+        for stage, elapsed in spans:
+            stages[stage] = stages.get(stage, 0.0) + elapsed
+        summary = ", ".join(f"{stage}={elapsed:.3f}s" for stage, elapsed in stages.items())
+        logger.info(f"{request} finished in {total:.3f}s ({summary})",
+                    request=request, total_seconds=round(total, 4),
+                    stages={stage: round(elapsed, 4) for stage, elapsed in stages.items()})
+
+def in_current_context(func: Callable) -> Callable:
+    """Wrap func so calls from worker threads record spans (and profiles) against the caller's request"""
+    context = contextvars.copy_context()
+    func = profile_task(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the application log
+        pass
+
+def start_metrics_server(port: int = 9100, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics in Prometheus format from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics at http://{host}:{port}/metrics")
+    return server
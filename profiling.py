@@ -0,0 +1,221 @@
+import cProfile
+import contextvars
+import functools
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+from logger_service import LoggerService
+
+logger = LoggerService()
+
+# BOUNCY_PROFILE=1 profiles every request; otherwise BOUNCY_PROFILE_SAMPLE_RATE (0-1)
+# profiles that fraction of requests. Both are read once so the disabled path is a
+# single comparison.
+if os.getenv("BOUNCY_PROFILE") == "1":
+    SAMPLE_RATE = 1.0
+else:
+    SAMPLE_RATE = float(os.getenv("BOUNCY_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = Path("logs") / "profiles"
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 20
+# Before 3.12 cProfile only sees the thread that enabled it. From 3.12 it hooks
+# sys.monitoring: it sees every thread, and only one profiler can be active at a time.
+PER_THREAD_PROFILERS = sys.version_info < (3, 12)
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+def _start_tracemalloc() -> bool:
+    """Start tracemalloc for this request; returns True if this call started it"""
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users += 1
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(10)
+        return True
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+class _StageProfile:
+    """Raw stats of a stage profiled in a worker process, in the form pstats.Stats.add accepts"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+class _Session:
+    """
+    The profile of one sampled request, plus the profiles of tasks it handed to worker
+    threads and of stages it ran in the CPU process pool
+    """
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.profiler = cProfile.Profile()
+        self.tasks: List[cProfile.Profile] = []
+        self.stages: List[_StageProfile] = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add_task(self, profiler: cProfile.Profile):
+        with self._lock:
+            if not self.closed:
+                self.tasks.append(profiler)
+
+    def add_stage(self, stats: dict):
+        with self._lock:
+            if not self.closed:
+                self.stages.append(_StageProfile(stats))
+
+    def stats(self, stream) -> pstats.Stats:
+        with self._lock:
+            self.closed = True
+            stats = pstats.Stats(self.profiler, stream=stream)
+            for task in self.tasks + self.stages:
+                stats.add(task)
+        return stats
+
+# Set while a sampled request runs; in_current_context carries it into worker threads
+_session: contextvars.ContextVar[Optional[_Session]] = contextvars.ContextVar("profile_session", default=None)
+
+@contextmanager
+def profile_request(name: str, force: bool = False):
+    """
+    Capture a cProfile call graph and tracemalloc allocations for one request.
+
+    Sampled according to SAMPLE_RATE unless `force` is set. Nested calls are folded
+    into the outer profile. Before Python 3.12 cProfile only sees the thread that enabled
+    it, so tasks the request hands to threads through metrics.in_current_context
+    (full-song windows, I/O stages) are profiled with profile_task and merged in. From
+    3.12 one profiler sees every thread, and a request sampled while another profiler
+    is active runs unprofiled. Stages sent to the CPU process pool are profiled in the
+    worker and merged in by execution.StageExecutor. Writes `<name>_<time>.prof` (pstats) and a `.txt` summary
+    under logs/profiles/. Usable as a decorator.
+    """
+    sampled = force or (SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE)
+    if not sampled or _session.get() is not None:
+        yield
+        return
+
+    session = _Session()
+    token = _session.set(session)
+    _start_tracemalloc()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    try:
+        session.profiler.enable()
+    except ValueError as e:
+        # Another request's profiler (or another tool) is active; never fail the request over it
+        _stop_tracemalloc()
+        _session.reset(token)
+        logger.warning(f"Not profiling {name}: {e}")
+        yield
+        return
+    try:
+        yield
+    finally:
+        session.profiler.disable()
+        elapsed = time.perf_counter() - start
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        _stop_tracemalloc()
+        _session.reset(token)
+        try:
+            _write_profile(name, session, before, after, peak, elapsed)
+        except Exception as e:
+            logger.warning(f"Failed to write profile for {name}: {e}")
+
+def disable_sampling():
+    """Stop this process from sampling requests itself, e.g. in a CPU worker whose parent decides"""
+    global SAMPLE_RATE
+    SAMPLE_RATE = 0.0
+
+def is_profiling() -> bool:
+    """Whether the request running in this context is being profiled"""
+    return _session.get() is not None
+
+def capture_profile(func: Callable, *args, **kwargs) -> Tuple[object, Optional[dict]]:
+    """Call func under its own profiler and return its result with the raw stats, e.g. inside a worker process"""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return func(*args, **kwargs), None  # Another profiler is active; run unprofiled
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, profiler.stats
+
+def merge_profile(stats: Optional[dict]):
+    """Fold stats returned by capture_profile into the profile of the request running in this context"""
+    session = _session.get()
+    if session is not None and stats:
+        session.add_stage(stats)
+
+def profile_task(func: Callable) -> Callable:
+    """
+    Wrap func so that, when called in a worker thread on behalf of a sampled request,
+    it runs under its own profiler whose stats are merged into the request's profile.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _session.get()
+        if session is None or session.thread == threading.get_ident() or not PER_THREAD_PROFILERS:
+            # Not sampled, or run on a thread the request profiler already covers
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            session.add_task(profiler)
+    return wrapper
+
+def _write_profile(name: str, session: _Session, before: tracemalloc.Snapshot,
+                   after: tracemalloc.Snapshot, peak: int, elapsed: float):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    stem = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}"
+    report = io.StringIO()
+    stats = session.stats(report)
+    stats.dump_stats(PROFILE_DIR / f"{stem}.prof")
+
+    report.write(f"{name}: {elapsed:.3f}s wall, peak traced memory {peak / (1024 * 1024):.1f} MB\n")
+    if PER_THREAD_PROFILERS:
+        report.write(f"Covers the request thread, {len(session.tasks)} worker-thread tasks")
+    else:
+        report.write("Covers every thread while the request ran (including other requests' work)")
+    report.write(f" and {len(session.stages)} CPU-pool stages; their times add up, so totals can exceed "
+                 f"wall time. Allocations are traced in the request's process only\n\n")
+    report.write(f"== Top {TOP_FUNCTIONS} functions by cumulative time ==\n")
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    report.write(f"\n== Top {TOP_ALLOCATIONS} allocation sites still held at the end of the request ==\n")
+    for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]:
+        report.write(f"{stat}\n")
+
+    summary_path = PROFILE_DIR / f"{stem}.txt"
+    summary_path.write_text(report.getvalue(), encoding="utf-8")
+    logger.info(f"Profile for {name} written to {summary_path}", profile=str(summary_path))
@@ -1,7 +1,29 @@
 import pygame
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Union
 from dance_movements import DanceMovements, Position
+from dance_plan import RenderPlan, parse_dance_sequence, compile_render_plan
+from metrics import span
+
+# Frames are single-channel uint8 arrays of shape (height, width): the figure is black on
+# white, so one channel holds the whole image. "packed" frames go further and store one
+# bit per pixel with np.packbits (lossless, as the figure is drawn without antialiasing).
+FRAME_FORMATS = ("gray", "packed")
+
+def pack_frame(frame: np.ndarray) -> np.ndarray:
+    """Pack a grayscale frame to 1 bit per pixel (set = white)"""
+    return np.packbits(frame > 127, axis=1)
+
+def unpack_frame(packed: np.ndarray, width: int) -> np.ndarray:
+    """Expand a packed frame back to a (height, width) grayscale frame"""
+    return np.unpackbits(packed, axis=1, count=width) * np.uint8(255)
+
+def surface_to_gray(surface: pygame.Surface) -> np.ndarray:
+    """Copy a black-on-white surface into a C-contiguous (height, width) uint8 frame"""
+    red = pygame.surfarray.pixels_red(surface)  # (width, height) view that locks the surface
+    frame = red.T.copy()
+    del red
+    return frame
 
 class StickFigureAnimator:
     def __init__(self, width=400, height=400):
@@ -79,15 +101,16 @@ class StickFigureAnimator:
         """Very smooth easing for contemporary"""
         return t * t * t * (t * (6 * t - 15) + 10)
 
+    @span("render_frames")
     def create_animation(self, movements: List[Dict], dance_style: str) -> List[np.ndarray]:
-        """Create animation frames with style-specific timing"""
+        """Create grayscale animation frames with style-specific timing"""
         frames = []
         style_params = self.style_timing[dance_style]
         
         for movement in movements:
             # Get frames for this movement
             movement_frames = movement["frames"]
-            timing = int(movement["timing"].split()[0])  # Extract number from "X beats"
+            timing = float(movement["timing"].split()[0])  # Extract number from "X beats" or "2.0"
             
             # Calculate frames based on style timing
             frames_per_transition = style_params["frames_per_beat"] * timing
@@ -108,14 +131,53 @@ class StickFigureAnimator:
                     interpolated_pos = self.interpolate_position(start_pos, end_pos, progress)
                     self.surface.fill((255, 255, 255))
                     self._draw_stick_figure(interpolated_pos)
-                    frames.append(pygame.surfarray.array3d(self.surface))
+                    frames.append(surface_to_gray(self.surface))
                 
-                # Add style-specific hold frames
+                # Add style-specific hold frames; frames are never modified, so share the array
                 for _ in range(style_params["hold_frames"]):
-                    frames.append(frames[-1].copy())
+                    frames.append(frames[-1])
         
         return frames
 
+    def compile_plan(self, sequence: Union[str, dict], dance_style: str, fps: int = 25,
+                     initial_pose: str = None) -> RenderPlan:
+        """Validate an LLM dance sequence and precompute its per-frame joint positions"""
+        style_params = self.style_timing[dance_style]
+        steps = parse_dance_sequence(sequence, dance_style, self.positions)
+        return compile_render_plan(
+            steps, dance_style, self.positions,
+            easing=style_params["easing"],
+            hold_frames=style_params["hold_frames"],
+            fps=fps, width=self.width, height=self.height,
+            initial_pose=initial_pose
+        )
+
+    @span("render_frames")
+    def render_plan(self, plan: RenderPlan, frame_format: str = "gray") -> List[np.ndarray]:
+        """
+        Draw a compiled plan, one frame per row of precomputed joints.
+
+        Frames are in `frame_format` (see FRAME_FORMATS). Rows repeating the previous
+        pose, such as holds, reuse the previous frame object instead of redrawing it.
+        """
+        if frame_format not in FRAME_FORMATS:
+            raise ValueError(f"Unknown frame format {frame_format!r}, expected one of {FRAME_FORMATS}")
+        frames = []
+        previous = None
+        for joints in plan.joints.tolist():
+            if joints == previous:
+                frames.append(frames[-1])
+                continue
+            head, body, left_arm, right_arm, left_leg, right_leg = joints
+            self.surface.fill((255, 255, 255))
+            self._draw_stick_figure(Position(head=head, body=body,
+                                             arms=[left_arm, right_arm],
+                                             legs=[left_leg, right_leg]))
+            frame = surface_to_gray(self.surface)
+            frames.append(pack_frame(frame) if frame_format == "packed" else frame)
+            previous = joints
+        return frames
+
     def _draw_stick_figure(self, pos: Position):
         """Draw stick figure with smooth lines and joints"""
         # Draw body
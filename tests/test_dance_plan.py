@@ -0,0 +1,75 @@
+import pytest
+from choreographer import LocalChoreographer
+from dance_movements import DanceMovements
+from dance_plan import DanceStep, compile_render_plan, format_timecode, parse_dance_sequence, parse_timecode
+
+FPS = 25
+POSES = DanceMovements.calculate_positions((200, 200))
+GENRES = ("Tap Dance", "Broadway", "Hip Hop", "Contemporary")
+
+def compile_steps(steps, fps=FPS):
+    return compile_render_plan(steps, "Broadway", POSES, easing=lambda t: t, hold_frames=5,
+                               fps=fps, width=400, height=400)
+
+def compile_sequence(sequence, genre):
+    steps = parse_dance_sequence(sequence, genre, POSES)
+    return compile_render_plan(steps, genre, POSES, easing=lambda t: t, hold_frames=5,
+                               fps=FPS, width=400, height=400)
+
+def test_timecode_round_trip():
+    assert parse_timecode(format_timecode(83.45)) == pytest.approx(83.45)
+    assert parse_timecode("00:01:05.5") == pytest.approx(65.5)
+
+def test_trailing_step_shorter_than_a_frame_holds_to_the_end():
+    steps = [
+        DanceStep(0.0, 4.99, "tap_feet_together", "tap_feet_together", "static"),
+        DanceStep(4.99, 0.01, "right_foot_forward", "right_foot_forward", "dynamic")
+    ]
+    plan = compile_steps(steps)
+    assert len(plan) == 125
+    assert (plan.joints[-1] == plan.joints[-2]).all()
+
+def test_step_rounding_does_not_drift():
+    beat = 60.0 / 117.45
+    steps = [DanceStep(i * beat, beat, pose, pose, "dynamic")
+             for i, pose in enumerate(["tap_feet_together", "right_foot_forward"] * 180)]
+    plan = compile_steps(steps)
+    assert len(plan) == round(360 * beat * FPS)
+
+@pytest.mark.parametrize("genre", GENRES)
+def test_local_sequences_compile_to_their_duration(genre):
+    choreographer = LocalChoreographer(seed=0)
+    for tenth_bpm in range(400, 2400, 37):
+        sequence = choreographer.generate(genre, tenth_bpm / 10, duration=5.0)
+        assert len(compile_sequence(sequence, genre)) == 5 * FPS, tenth_bpm / 10
+
+def test_broadway_72_2_bpm_regression():
+    sequence = LocalChoreographer().generate("Broadway", 72.2)
+    assert len(compile_sequence(sequence, "Broadway")) == 125
+
+@pytest.mark.parametrize("genre", GENRES)
+def test_local_sequences_have_no_sliver_steps(genre):
+    from choreographer import MIN_POSE_SECONDS
+
+    choreographer = LocalChoreographer(seed=0)
+    for tenth_bpm in range(400, 2400, 37):
+        for step in choreographer.generate(genre, tenth_bpm / 10, duration=5.0)["dance_sequence"]:
+            assert parse_timecode(step["duration"]) >= MIN_POSE_SECONDS - 0.01
+
+@pytest.mark.parametrize("genre", GENRES)
+def test_chained_local_windows_continue_pose_and_beat_grid(genre):
+    # At 100 BPM steps are multiples of 0.6s: they fall on hundredths but not on window edges
+    choreographer = LocalChoreographer(seed=0)
+    first = choreographer.generate(genre, 100.0, duration=5.0)
+    step_seconds = parse_timecode(first["dance_sequence"][1]["timestamp"])
+    pose, first_beat = first["metadata"]["end_pose"], first["metadata"]["next_beat"]
+    for window in range(1, 6):
+        data = choreographer.generate(genre, 100.0, duration=5.0, start_pose=pose, first_beat=first_beat)
+        sequence = data["dance_sequence"]
+        moved_to = {other for other, _ in choreographer.transition_graph(genre)[pose]}
+        assert sequence[0]["pose_name"] == pose or sequence[0]["pose_name"] in moved_to
+        for step in sequence[1:]:
+            beats = (window * 5.0 + parse_timecode(step["timestamp"])) / step_seconds
+            assert beats == pytest.approx(round(beats), abs=0.01)
+        assert len(compile_sequence(data, genre)) == 5 * FPS
+        pose, first_beat = data["metadata"]["end_pose"], data["metadata"]["next_beat"]
@@ -0,0 +1,14 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+import execution
+
+@pytest.mark.skipif(execution.INLINE, reason="stages run inline")
+def test_cpu_pool_recovers_after_a_worker_dies():
+    stages = execution.StageExecutor()
+    try:
+        with pytest.raises(BrokenProcessPool):
+            stages.run_cpu(os._exit, 1)
+        assert stages.run_cpu(os.getpid) != os.getpid()
+    finally:
+        stages.shutdown()
@@ -0,0 +1,29 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import profiling
+
+def square_sum(n):
+    return sum(i * i for i in range(n))
+
+def sampled_request(name):
+    with profiling.profile_request(name, force=True):
+        context = contextvars.copy_context()
+        task = profiling.profile_task(square_sum)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            return list(pool.map(lambda n: context.copy().run(task, n), [1000, 2000]))
+
+def test_profiling_never_changes_request_results(tmp_path, monkeypatch):
+    # Concurrent sampled requests with worker-thread tasks: from Python 3.12 only one
+    # profiler may be active, and the others must still run normally
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    results = {}
+    threads = [threading.Thread(target=lambda name=name: results.update({name: sampled_request(name)}))
+               for name in ("first", "second")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    expected = [square_sum(1000), square_sum(2000)]
+    assert results == {"first": expected, "second": expected}
+    assert list(tmp_path.glob("*.prof"))
@@ -1,17 +1,25 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Optional
+from dataclasses import replace
+import numpy as np
 import os
-import requests
-import urllib.request
 from pathlib import Path
 from datetime import datetime
-import pygame
 from logger_service import LoggerService
-import replicate
-import cv2  # Make sure to install opencv-python for video saving
+from dance_plan import RenderPlan
+from metrics import span
+from execution import StageExecutor
+from profiling import profile_request
+
+# pygame, cv2, replicate and requests are imported inside the generators that need
+# them, so importing this module (e.g. for get_video_generator) stays cheap.
 
 logger = LoggerService()
 
+# In-memory frame format between drawing and encoding: "gray" (1 byte per pixel) or
+# "packed" (1 bit per pixel, for very long or high-resolution plans); see stick_figure_animator
+FRAME_FORMAT = os.getenv("BOUNCY_FRAME_FORMAT", "gray")
+
 class VideoGenerator(ABC):
     @abstractmethod
     def generate(self, movements: List[Dict]) -> str:
@@ -19,8 +27,13 @@ class VideoGenerator(ABC):
         pass
 
 class ReplicateGenerator(VideoGenerator):
+    @profile_request("replicate_generate")
     def generate(self, movements: List[Dict]) -> str:
         """Generate video using Replicate API"""
+        import replicate
+        import requests
+        import urllib.request
+
         try:
             # Create videos directory if it doesn't exist
             video_dir = Path("videos")
@@ -50,25 +63,27 @@ class ReplicateGenerator(VideoGenerator):
             }
             
             api = replicate.Client(api_token=api_token)
-            output = api.run(
-                "tencent/hunyuan-video:847dfa8b01e739637fc76f480ede0c1d76408e1d694b830b5dfb8e547bf98405",
-                input=input
-            )
+            with span("replicate_run"):
+                output = api.run(
+                    "tencent/hunyuan-video:847dfa8b01e739637fc76f480ede0c1d76408e1d694b830b5dfb8e547bf98405",
+                    input=input
+                )
             
             if output and output[0]:
                 video_url = output[0]
                 video_filename = f"dance_replicate_{timestamp}.mp4"
                 video_path = video_dir / video_filename
                 
-                try:
-                    response = requests.get(video_url, stream=True)
-                    response.raise_for_status()
-                    with open(video_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                except Exception as e:
-                    logger.warning(f"Failed to download with requests, trying urllib: {e}")
-                    urllib.request.urlretrieve(video_url, video_path)
+                with span("replicate_download"):
+                    try:
+                        response = requests.get(video_url, stream=True)
+                        response.raise_for_status()
+                        with open(video_path, 'wb') as f:
+                            for chunk in response.iter_content(chunk_size=8192):
+                                f.write(chunk)
+                    except Exception as e:
+                        logger.warning(f"Failed to download with requests, trying urllib: {e}")
+                        urllib.request.urlretrieve(video_url, video_path)
                 
                 return str(video_path)
             return None
@@ -78,8 +93,13 @@ class ReplicateGenerator(VideoGenerator):
             raise
 
 class PygameGenerator(VideoGenerator):
+    @profile_request("pygame_generate")
     def generate(self, movements: List[Dict]) -> str:
         """Generate a video using Pygame and OpenCV"""
+        import pygame
+        import cv2  # Make sure to install opencv-python for video saving
+        from stick_figure_animator import surface_to_gray
+
         try:
             # Create output directory for videos
             video_dir = Path("videos")
@@ -101,20 +121,20 @@ class PygameGenerator(VideoGenerator):
             fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec for MP4
             fps = 25
             out = cv2.VideoWriter(str(video_path), fourcc, fps, (width, height))
+            bgr = np.empty((height, width, 3), dtype=np.uint8)
 
             # Process each movement
-            for move in movements:
-                # Draw frame content
-                screen.fill((255, 255, 255))  # White background
-                font = pygame.font.Font(None, 36)
-                text = font.render(move['movement'], True, (0, 0, 0))
-                screen.blit(text, (width // 2 - text.get_width() // 2, height // 2))
-
-                # Convert Pygame surface to OpenCV-compatible format
-                frame = pygame.surfarray.array3d(screen)
-                frame = cv2.transpose(frame)  # Transpose for correct orientation
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)  # Convert RGB to BGR
-                out.write(frame)  # Write frame to video
+            with span("render_encode"):
+                for move in movements:
+                    # Draw frame content
+                    screen.fill((255, 255, 255))  # White background
+                    font = pygame.font.Font(None, 36)
+                    text = font.render(move['movement'], True, (0, 0, 0))
+                    screen.blit(text, (width // 2 - text.get_width() // 2, height // 2))
+
+                    # Black text on white: one channel is the whole frame, expanded to BGR for the writer
+                    frame = surface_to_gray(screen)
+                    out.write(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=bgr))
 
             # Finalize and clean up
             out.release()
@@ -127,6 +147,67 @@ class PygameGenerator(VideoGenerator):
             logger.error(f"Error in Pygame video generation: {str(e)}", exc_info=True)
             raise
 
+    @profile_request("pygame_generate_from_plan")
+    def generate_from_plan(self, plan: RenderPlan, video_path: Optional[str] = None,
+                           workers: int = 1, frame_format: str = FRAME_FORMAT) -> str:
+        """
+        Render a compiled dance plan with the stick figure animator and save it as MP4.
+
+        Frames only depend on the plan's precomputed joints, so with `workers` > 1
+        the plan is split into contiguous chunks drawn concurrently in the CPU process
+        pool (pygame drawing holds the GIL, so threads would not help). Frames stay
+        single-channel (or 1-bit packed) until each one is written.
+        """
+        import cv2
+        from stick_figure_animator import unpack_frame
+
+        try:
+            if video_path is None:
+                video_dir = Path("videos")
+                video_dir.mkdir(exist_ok=True)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                video_path = video_dir / f"dance_pygame_{timestamp}.mp4"
+
+            logger.info(f"Rendering {len(plan)} frames of {plan.dance_style} with Pygame")
+
+            chunks = [c for c in np.array_split(plan.joints, max(1, workers)) if len(c)]
+            if len(chunks) > 1:
+                # Frames come back pickled from the workers; packed frames are 8x smaller
+                frame_format = "packed"
+            stages = StageExecutor()
+            futures = [stages.submit("cpu", render_plan_frames, replace(plan, joints=joints), frame_format)
+                       for joints in chunks]
+            frames = [frame for future in futures for frame in future.result()]
+
+            with span("encode_video"):
+                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+                out = cv2.VideoWriter(str(video_path), fourcc, plan.fps, (plan.width, plan.height))
+                # Expand to the writer's BGR only at write time, into one reused buffer
+                bgr = np.empty((plan.height, plan.width, 3), dtype=np.uint8)
+                for frame in frames:
+                    if frame_format == "packed":
+                        frame = unpack_frame(frame, plan.width)
+                    out.write(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=bgr))
+                out.release()
+
+            logger.info(f"Video saved to {video_path}")
+            return str(video_path)
+
+        except Exception as e:
+            logger.error(f"Error in Pygame plan rendering: {str(e)}", exc_info=True)
+            raise
+
+def render_plan_frames(plan: RenderPlan, frame_format: str = FRAME_FORMAT) -> List[np.ndarray]:
+    """Module-level entry point so a chunk of a plan can be drawn in a worker process"""
+    from stick_figure_animator import StickFigureAnimator
+
+    return StickFigureAnimator(width=plan.width, height=plan.height).render_plan(plan, frame_format)
+
+def render_plan_video(plan: RenderPlan, video_path: Optional[str] = None, workers: int = 1,
+                      frame_format: str = FRAME_FORMAT) -> str:
+    """Module-level entry point so plan rendering can run in a worker process"""
+    return PygameGenerator().generate_from_plan(plan, video_path, workers=workers, frame_format=frame_format)
+
 def get_video_generator(generator_type: str) -> VideoGenerator:
     """Factory function to get the appropriate video generator."""
     generators = {